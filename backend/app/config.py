@@ -7,7 +7,62 @@ class Settings:
     SECRET_KEY = os.getenv("SECRET_KEY", "changeme")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
     ALGORITHM = "HS256"
+    # Verified access tokens kept (until they expire) to skip re-decoding
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+    # bcrypt runs in its own process pool; logins beyond PASSWORD_MAX_PENDING
+    # queued or running hashes get a 503 instead of waiting
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+    PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", 32))
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # Defaults to DATABASE_URL with its async driver (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
     CACHE_TTL = int(os.getenv("CACHE_TTL", 300))
+    # Connection pooling for server databases (PostgreSQL etc.)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    # SQLite file databases
+    SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", 8))
+    SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", 16))
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+    # Group-commit writer for XP awards; window is how long the first queued
+    # award waits for company before its batch is committed
+    XP_WRITER_ENABLED = os.getenv("XP_WRITER_ENABLED", "true").lower() in ("1", "true", "yes")
+    XP_WRITER_WINDOW_MS = float(os.getenv("XP_WRITER_WINDOW_MS", 5))
+    XP_WRITER_MAX_BATCH = int(os.getenv("XP_WRITER_MAX_BATCH", 256))
+    # XP earned this week is persisted as this week's board every N seconds
+    LEADERBOARD_SNAPSHOT_SECONDS = int(os.getenv("LEADERBOARD_SNAPSHOT_SECONDS", 300))
+    LEADERBOARD_SNAPSHOT_SIZE = int(os.getenv("LEADERBOARD_SNAPSHOT_SIZE", 1000))
+    # XP per correct answer in the weekly trivia challenge
+    TRIVIA_XP_PER_CORRECT = int(os.getenv("TRIVIA_XP_PER_CORRECT", 5))
+    # Challenges are assembled from the question bank this many weeks ahead
+    TRIVIA_WEEKS_AHEAD = int(os.getenv("TRIVIA_WEEKS_AHEAD", 4))
+    TRIVIA_QUESTIONS_PER_WEEK = int(os.getenv("TRIVIA_QUESTIONS_PER_WEEK", 15))
+    # Browser/CDN lifetime for encyclopedia responses; ETags revalidate after it
+    ENCYCLOPEDIA_MAX_AGE = int(os.getenv("ENCYCLOPEDIA_MAX_AGE", 86400))
+    # AI guide: answer provider ("stub" answers locally) and the answer cache in front of it
+    AI_PROVIDER = os.getenv("AI_PROVIDER", "stub")
+    AI_STUB_LATENCY_MS = float(os.getenv("AI_STUB_LATENCY_MS", 0))
+    AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", 5000))
+    # Minimum Jaccard similarity of topic words for a near-duplicate cache hit;
+    # faiths, places of worship and negations must match regardless
+    AI_CACHE_SIMILARITY = float(os.getenv("AI_CACHE_SIMILARITY", 0.75))
+    # AIQuestionLog rows are queued and bulk-inserted by a background writer.
+    # When the queue is full, "drop" discards new rows; "block" waits up to
+    # AI_LOG_BLOCK_MS for room first
+    AI_LOG_QUEUE_SIZE = int(os.getenv("AI_LOG_QUEUE_SIZE", 10000))
+    AI_LOG_BATCH_SIZE = int(os.getenv("AI_LOG_BATCH_SIZE", 500))
+    AI_LOG_FLUSH_MS = float(os.getenv("AI_LOG_FLUSH_MS", 250))
+    AI_LOG_FULL_POLICY = os.getenv("AI_LOG_FULL_POLICY", "drop").lower()
+    AI_LOG_BLOCK_MS = float(os.getenv("AI_LOG_BLOCK_MS", 50))
+    LESSON_CACHE_SIZE = int(os.getenv("LESSON_CACHE_SIZE", 512))
+    # Cache lesson responses as encoded JSON bytes instead of dicts
+    PRESERIALIZE_LESSONS = os.getenv("PRESERIALIZE_LESSONS", "true").lower() in ("1", "true", "yes")
 
 settings = Settings() 
\ No newline at end of file
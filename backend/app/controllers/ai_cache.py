@@ -0,0 +1,274 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict, defaultdict
+from threading import RLock
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.controllers.ai_provider import AnswerProvider, create_provider
+from app.models.models import AIQuestionLog
+from app.utils.text import fold_words
+
+# Question scaffolding that says nothing about the topic
+_FILLER = frozenset(
+    """a an and any are as at be by can could do does did for from how i if in is it me my of on or our should
+    some someone the there to we what when where which who why will with would you your""".split()
+)
+
+# Words that change which answer is right however similar the rest of the
+# question is. A near-duplicate must name the same faiths, groups and places
+# of worship and agree on negation; each alias maps to one canonical label.
+_GUARDED = {
+    "hindu": "hindu hindus hinduism",
+    "muslim": "muslim muslims islam islamic",
+    "sikh": "sikh sikhs sikhism",
+    "buddhist": "buddhist buddhists buddhism",
+    "christian": "christian christians christianity",
+    "catholic": "catholic catholics catholicism",
+    "protestant": "protestant protestants",
+    "orthodox": "orthodox",
+    "jewish": "jewish jew jews judaism",
+    "bahai": "bahai bahais",
+    "taoist": "taoist taoists taoism daoist daoism",
+    "confucian": "confucian confucianism",
+    "shinto": "shinto",
+    "jain": "jain jains jainism",
+    "zoroastrian": "zoroastrian zoroastrians zoroastrianism parsi parsis",
+    "temple": "temple temples",
+    "mosque": "mosque mosques masjid",
+    "church": "church churches cathedral cathedrals chapel chapels",
+    "gurdwara": "gurdwara gurdwaras gurudwara",
+    "synagogue": "synagogue synagogues",
+    "shrine": "shrine shrines",
+    "pagoda": "pagoda pagodas",
+    "monastery": "monastery monasteries",
+    "not": "not no never nor none without avoid dont doesnt didnt cant cannot shouldnt wont wouldnt isnt arent mustnt",
+}
+_GUARD = {alias: label for label, aliases in _GUARDED.items() for alias in aliases.split()}
+
+# MinHash signature of NUM_PERM values, split into BANDS bands for LSH. Two
+# queries become candidates when any band matches: with 20 bands of 3 rows a
+# pair at Jaccard 0.75 is found over 99.9% of the time, one at 0.2 about 15%.
+BANDS = 20
+ROWS = 3
+NUM_PERM = BANDS * ROWS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _stem(word: str) -> str:
+    # Just enough to make "temples"/"temple" and "visiting"/"visit" agree
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+class NormalizedQuery(NamedTuple):
+    # Ignores case, accents and punctuation
+    key: str
+    # Topic words without question filler or plurals: what similarity compares
+    terms: FrozenSet[str]
+    # Canonical faith, group, place and negation labels: must match exactly
+    guard: FrozenSet[str]
+
+
+def normalize(query: str) -> NormalizedQuery:
+    words = fold_words(query)
+    return NormalizedQuery(
+        " ".join(words),
+        frozenset(_stem(word) for word in words if word not in _FILLER),
+        frozenset(_GUARD[word] for word in words if word in _GUARD),
+    )
+
+
+def minhash(terms: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [hash(term) & _PRIME for term in terms]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class _Entry(NamedTuple):
+    key: str
+    terms: FrozenSet[str]
+    guard: FrozenSet[str]
+    response: str
+    bands: List[Tuple[int, Tuple[int, ...]]]
+
+
+class CachedAnswer(NamedTuple):
+    response: str
+    match: str  # "exact" or "near"
+    similarity: float
+
+
+class AnswerCache:
+    """Answers to past questions, found by exact key or MinHash near-duplicate.
+
+    Exact keys are a dict lookup. Otherwise the query's MinHash bands select
+    candidate entries (LSH), and the best candidate is accepted if its exact
+    term Jaccard similarity reaches `threshold` and it names the same faiths,
+    groups and places with the same negation. Entries are evicted least
+    recently used beyond `maxsize`.
+    """
+
+    def __init__(self, maxsize: int, threshold: float):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._exact: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = defaultdict(set)
+        self._next_id = 0
+        self._lock = RLock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.provider_calls = 0
+        self.provider_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, query: str) -> Optional[CachedAnswer]:
+        key, terms, guard = normalize(query)
+        with self._lock:
+            entry_id = self._exact.get(key)
+            if entry_id is not None:
+                self.exact_hits += 1
+                self._entries.move_to_end(entry_id)
+                entry = self._entries[entry_id]
+                return CachedAnswer(entry.response, "exact", 1.0)
+            best, best_similarity = None, 0.0
+            if terms:
+                candidates = set()
+                for band in _bands(minhash(terms)):
+                    candidates.update(self._buckets.get(band, ()))
+                for candidate in candidates:
+                    entry = self._entries[candidate]
+                    if entry.guard != guard:
+                        # "Sikh temple" is not "Hindu temple", "not wear" is not "wear"
+                        continue
+                    similarity = jaccard(terms, entry.terms)
+                    if similarity > best_similarity:
+                        best, best_similarity = candidate, similarity
+            if best is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+            self._entries.move_to_end(best)
+            entry = self._entries[best]
+            return CachedAnswer(entry.response, "near", round(best_similarity, 4))
+
+    def add(self, query: str, response: str) -> None:
+        key, terms, guard = normalize(query)
+        bands = _bands(minhash(terms)) if terms else []
+        with self._lock:
+            previous = self._exact.get(key)
+            if previous is not None:
+                self._drop(previous)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(key, terms, guard, response, bands)
+            self._exact[key] = entry_id
+            for band in bands:
+                self._buckets[band].add(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        if self._exact.get(entry.key) == entry_id:
+            del self._exact[entry.key]
+        for band in entry.bands:
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band]
+
+    def load(self, rows: Iterable[Tuple[str, str]]) -> None:
+        # Oldest first, so the newest answers are the last to be evicted
+        with self._lock:
+            for query, response in rows:
+                self.add(query, response)
+
+    def record_provider_call(self, seconds: float) -> None:
+        with self._lock:
+            self.provider_calls += 1
+            self.provider_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            lookups = hits + self.misses
+            average = self.provider_seconds / self.provider_calls if self.provider_calls else 0.0
+            return {
+                "entries": len(self._entries),
+                "lookups": lookups,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "provider_calls": self.provider_calls,
+                "avg_provider_ms": round(average * 1000, 2),
+                # Each hit skipped one provider round trip of average length
+                "latency_saved_ms": round(hits * average * 1000, 2),
+                "threshold": self.threshold,
+            }
+
+
+ai_cache = AnswerCache(settings.AI_CACHE_SIZE, settings.AI_CACHE_SIMILARITY)
+answer_provider: AnswerProvider = create_provider(settings.AI_PROVIDER, settings.AI_STUB_LATENCY_MS / 1000)
+# Misses being answered right now, by exact key: repeats wait for the same call
+_inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+
+async def load_ai_cache(db: AsyncSession) -> AnswerCache:
+    rows = (await db.execute(
+        select(AIQuestionLog.query, AIQuestionLog.response).order_by(AIQuestionLog.id.desc()).limit(ai_cache.maxsize)
+    )).all()
+    ai_cache.load(reversed(rows))
+    return ai_cache
+
+
+async def answer_query(query: str) -> Tuple[str, Optional[CachedAnswer]]:
+    """Answer from the cache, or from the provider on a miss; returns (answer, cache match or None)."""
+    cached = ai_cache.lookup(query)
+    if cached is not None:
+        return cached.response, cached
+    key = normalize(query).key
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending), None
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        started = time.perf_counter()
+        response = await answer_provider.answer(query)
+        ai_cache.record_provider_call(time.perf_counter() - started)
+        ai_cache.add(query, response)
+        future.set_result(response)
+        return response, None
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Nobody may be waiting; don't leave an unretrieved exception behind
+        future.exception()
+        raise
+    finally:
+        del _inflight[key]
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.models import AIQuestionLog
+
+logger = logging.getLogger(__name__)
+
+
+class AIQuestionLogWriter:
+    """Writes AIQuestionLog rows off the request path.
+
+    Requests put a row on a bounded queue and return immediately. A single
+    task drains it, waiting up to ``interval`` seconds (or until
+    ``batch_size`` rows) after the first arrival, and bulk-inserts the batch
+    in one transaction. When the queue is full, ``policy`` decides: "drop"
+    discards the row at once, "block" waits up to ``block_timeout`` seconds
+    for room and drops only if there is still none.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        maxsize: int,
+        batch_size: int,
+        interval: float,
+        policy: str = "drop",
+        block_timeout: float = 0.05,
+    ):
+        if policy not in ("drop", "block"):
+            logger.warning("Unknown AI log queue policy, dropping when full", extra={"policy": policy})
+            policy = "drop"
+        self._session_factory = session_factory
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.interval = interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.queued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.maxsize)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        # Sentinel: everything queued before it is flushed first
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def log(self, row: Dict[str, Any]) -> bool:
+        """Queue one row; False if it was dropped because the queue stayed full."""
+        try:
+            if self.policy == "block":
+                await asyncio.wait_for(self._queue.put(row), self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    async def _collect(self) -> Tuple[List[Dict[str, Any]], bool]:
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            try:
+                row = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if row is None:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            async with self._session_factory() as db:
+                # Core executemany: no ORM objects, one transaction per batch
+                await db.execute(insert(AIQuestionLog), batch)
+                await db.commit()
+        except Exception as e:
+            # The log is best-effort; a failed batch must not stop the writer
+            self.failed += len(batch)
+            logger.warning("Failed to write AI question log rows", extra={"rows": len(batch), "error": str(e)})
+            return
+        self.batches += 1
+        self.flushed += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "avg_batch": round(self.flushed / self.batches, 2) if self.batches else 0.0,
+            "capacity": self.maxsize,
+            "policy": self.policy,
+        }
+
+
+ai_log_writer = AIQuestionLogWriter(
+    AsyncSessionLocal,
+    settings.AI_LOG_QUEUE_SIZE,
+    settings.AI_LOG_BATCH_SIZE,
+    settings.AI_LOG_FLUSH_MS / 1000,
+    settings.AI_LOG_FULL_POLICY,
+    settings.AI_LOG_BLOCK_MS / 1000,
+)
+
+
+async def log_ai_question(db: AsyncSession, user_id: Optional[int], query: str, response: str) -> bool:
+    """Queue the log row on the writer, or insert it on ``db`` when the writer is off."""
+    # Stamped now, not when the batch lands
+    row = {"user_id": user_id, "query": query, "response": response, "timestamp": datetime.now(timezone.utc)}
+    if ai_log_writer.running:
+        return await ai_log_writer.log(row)
+    await db.execute(insert(AIQuestionLog), [row])
+    await db.commit()
+    return True
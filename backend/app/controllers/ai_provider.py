@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerProvider(Protocol):
+    """Anything that can answer a cultural etiquette question."""
+
+    name: str
+
+    async def answer(self, query: str) -> str:
+        ...
+
+
+class StubAnswerProvider:
+    """Deterministic local answers, for development and tests.
+
+    `latency` (seconds) simulates the model round trip so cache savings can
+    be measured without calling a real model.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def answer(self, query: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return (
+            f"Thank you for asking: {query.strip()}\n\n"
+            "Customs vary between communities and families, so when in doubt, ask your host politely. "
+            "Dress modestly, follow any posted guidance at places of worship, and observe what others do."
+        )
+
+
+def create_provider(name: str, stub_latency: float = 0.0) -> AnswerProvider:
+    if name != "stub":
+        logger.warning("Unknown AI provider, answering with the local stub", extra={"provider": name})
+    return StubAnswerProvider(stub_latency)
@@ -0,0 +1,78 @@
+import hashlib
+import logging
+import time
+from threading import RLock
+from typing import Any, Dict, NamedTuple, Optional
+
+from cachetools import TLRUCache
+from jose import jwt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class VerifiedToken(NamedTuple):
+    user_id: int
+    expires: float  # epoch seconds, the token's exp claim
+
+
+class TokenCache:
+    """Verified bearer tokens, so a repeat request skips `jwt.decode`.
+
+    Keyed by the SHA-256 digest of the token (raw tokens are never held) and
+    mapped to the user id. Each entry lives until its token's `exp`, and the
+    least recently used entries are evicted beyond `maxsize`. Tokens without
+    an expiry are verified every time.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = TLRUCache(maxsize=maxsize, ttu=lambda _key, value, _now: value.expires, timer=time.time)
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: bytes) -> Optional[int]:
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.user_id
+
+    def put(self, digest: bytes, user_id: int, expires: float) -> None:
+        with self._lock:
+            self._cache[digest] = VerifiedToken(user_id, expires)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._cache),
+            }
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def verify_token(token: str) -> int:
+    """User id of a valid access token; raises JWTError or ValueError otherwise."""
+    digest = hashlib.sha256(token.encode()).digest()
+    user_id = token_cache.get(digest)
+    if user_id is not None:
+        return user_id
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    user_id = int(payload.get("sub"))
+    expires = payload.get("exp")
+    if isinstance(expires, (int, float)):
+        token_cache.put(digest, user_id, float(expires))
+    logger.debug("Authenticated token", extra={"user_id": user_id})
+    return user_id
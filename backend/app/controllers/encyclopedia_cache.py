@@ -0,0 +1,121 @@
+from itertools import chain
+from threading import RLock
+from typing import Dict, Hashable, Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import EncyclopediaCategory, EncyclopediaEntry
+from app.schemas.schemas import EncyclopediaEntryResponse, EncyclopediaEntrySummary
+from app.utils.http_cache import EncodedBody, encode_body
+
+
+def entry_key(entry_id: int):
+    return ("entry", entry_id)
+
+
+def list_key(category: Optional[EncyclopediaCategory]):
+    return ("list", category)
+
+
+class EncyclopediaDocuments:
+    """Encoded encyclopedia responses, built once per entry version.
+
+    Keys are entry_key(id) and list_key(category). A committed change to an
+    entry drops that entry's document and every list; like the lesson cache,
+    a load that started before the change is not stored.
+    """
+
+    def __init__(self):
+        self._documents: Dict[Hashable, EncodedBody] = {}
+        self._lock = RLock()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        return self._documents.get(key)
+
+    def set(self, key: Hashable, document: EncodedBody, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._documents[key] = document
+
+    def invalidate(self, entry_ids: Iterable[int]) -> None:
+        with self._lock:
+            for entry_id in entry_ids:
+                self._documents.pop(entry_key(entry_id), None)
+            for key in [key for key in self._documents if key[0] == "list"]:
+                del self._documents[key]
+            self.generation += 1
+
+
+encyclopedia_documents = EncyclopediaDocuments()
+
+
+def _entry_document(entry: EncyclopediaEntry) -> EncodedBody:
+    return encode_body(EncyclopediaEntryResponse.from_orm(entry).model_dump_json().encode())
+
+
+def _list_document(entries: Iterable[EncyclopediaEntry]) -> EncodedBody:
+    return encode_body(b"[" + b",".join(EncyclopediaEntrySummary.from_orm(entry).model_dump_json().encode() for entry in entries) + b"]")
+
+
+async def load_entry_document(db: AsyncSession, entry_id: int) -> Optional[EncodedBody]:
+    key = entry_key(entry_id)
+    document = encyclopedia_documents.get(key)
+    if document is None:
+        generation = encyclopedia_documents.generation
+        entry = await db.get(EncyclopediaEntry, entry_id)
+        if entry is None:
+            return None
+        document = _entry_document(entry)
+        encyclopedia_documents.set(key, document, generation)
+    return document
+
+
+async def load_list_document(db: AsyncSession, category: Optional[EncyclopediaCategory]) -> EncodedBody:
+    key = list_key(category)
+    document = encyclopedia_documents.get(key)
+    if document is None:
+        generation = encyclopedia_documents.generation
+        query = select(EncyclopediaEntry).order_by(EncyclopediaEntry.category, EncyclopediaEntry.group_name)
+        if category is not None:
+            query = query.where(EncyclopediaEntry.category == category)
+        document = _list_document((await db.scalars(query)).all())
+        encyclopedia_documents.set(key, document, generation)
+    return document
+
+
+async def warm_encyclopedia(db: AsyncSession) -> int:
+    """Encode every entry and list in one read, so even first visits skip the database."""
+    generation = encyclopedia_documents.generation
+    entries = (await db.scalars(
+        select(EncyclopediaEntry).order_by(EncyclopediaEntry.category, EncyclopediaEntry.group_name)
+    )).all()
+    for entry in entries:
+        encyclopedia_documents.set(entry_key(entry.id), _entry_document(entry), generation)
+    encyclopedia_documents.set(list_key(None), _list_document(entries), generation)
+    for category in EncyclopediaCategory:
+        encyclopedia_documents.set(
+            list_key(category), _list_document(entry for entry in entries if entry.category == category), generation
+        )
+    return len(entries)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_entry_writes(session, flush_context):
+    entry_ids = [obj.id for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, EncyclopediaEntry)]
+    if entry_ids:
+        session.info.setdefault("encyclopedia_changed", set()).update(entry_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    entry_ids = session.info.pop("encyclopedia_changed", None)
+    if entry_ids:
+        encyclopedia_documents.invalidate(entry_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("encyclopedia_changed", None)
@@ -0,0 +1,141 @@
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import EncyclopediaCategory
+
+logger = logging.getLogger(__name__)
+
+# Each entry is indexed one row per non-empty section, with rowid
+# entry_id * SECTION_SLOTS + section index, so an entry's rows form a rowid
+# range that triggers can delete without scanning the index.
+SECTIONS = ("overview", "beliefs", "practices", "festivals", "etiquette", "misconceptions")
+SECTION_SLOTS = 8
+FTS_TABLE = "encyclopedia_fts"
+# Set once install_encyclopedia_search() has the index in place
+search_available = False
+
+_SECTION_ROWS = " UNION ALL ".join(
+    f"SELECT {index} AS idx, '{name}' AS name, {{row}}.{name} AS body" for index, name in enumerate(SECTIONS)
+)
+
+
+def _index_rows(row: str) -> str:
+    # Sections of a trigger's `new` row as FTS rows
+    return (
+        f"INSERT INTO {FTS_TABLE} (rowid, group_name, section, body) "
+        f"SELECT {row}.id * {SECTION_SLOTS} + s.idx, {row}.group_name, s.name, s.body "
+        f"FROM ({_SECTION_ROWS.format(row=row)}) AS s WHERE s.body IS NOT NULL AND s.body != ''"
+    )
+
+
+def _delete_rows(row: str) -> str:
+    return (
+        f"DELETE FROM {FTS_TABLE} WHERE rowid BETWEEN {row}.id * {SECTION_SLOTS} "
+        f"AND {row}.id * {SECTION_SLOTS} + {SECTION_SLOTS - 1}"
+    )
+
+
+_REBUILD = f"INSERT INTO {FTS_TABLE} (rowid, group_name, section, body) " + " UNION ALL ".join(
+    f"SELECT id * {SECTION_SLOTS} + {index}, group_name, '{name}', {name} FROM encyclopedia_entries "
+    f"WHERE {name} IS NOT NULL AND {name} != ''"
+    for index, name in enumerate(SECTIONS)
+)
+
+_DDL = [
+    # group_name is repeated on every section row so entry names rank
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "group_name, section UNINDEXED, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    f"CREATE TRIGGER encyclopedia_fts_ai AFTER INSERT ON encyclopedia_entries BEGIN {_index_rows('new')}; END",
+    f"CREATE TRIGGER encyclopedia_fts_ad AFTER DELETE ON encyclopedia_entries BEGIN {_delete_rows('old')}; END",
+    f"CREATE TRIGGER encyclopedia_fts_au AFTER UPDATE ON encyclopedia_entries BEGIN "
+    f"{_delete_rows('old')}; {_index_rows('new')}; END",
+]
+
+
+def install_encyclopedia_search(engine: Engine) -> bool:
+    """Create the FTS5 index and its sync triggers once, filling it from existing entries.
+
+    Returns False where FTS5 is unavailable (non-SQLite databases, or SQLite
+    built without it); search is then disabled.
+    """
+    global search_available
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        if not conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}).first():
+            try:
+                for statement in _DDL:
+                    conn.execute(text(statement))
+            except Exception as e:
+                logger.warning("Encyclopedia search disabled, FTS5 unavailable", extra={"error": str(e)})
+                return False
+            conn.execute(text(_REBUILD))
+    search_available = True
+    return True
+
+
+_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must match (implicit AND); a trailing * makes a word a prefix
+    query ("festiv*"). Words are quoted, so FTS5 operators and punctuation
+    in the input are never interpreted.
+    """
+    terms = []
+    for term in _TERM.findall(query):
+        word = term.rstrip("*")
+        terms.append(f'"{word}"*' if term.endswith("*") else f'"{word}"')
+    return " ".join(terms) or None
+
+
+# snippet() marks matches with private-use sentinels; the text is HTML-escaped
+# first and only then are the sentinels turned into <mark> tags
+_MARK_OPEN, _MARK_CLOSE = "\ue000", "\ue001"
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or "", quote=False)
+    return escaped.replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+_SEARCH = text(
+    f"""
+    SELECT e.id, e.category, e.group_name, {FTS_TABLE}.section,
+           snippet({FTS_TABLE}, 2, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 16) AS snippet,
+           bm25({FTS_TABLE}, 5.0, 0.0, 1.0) AS rank
+    FROM {FTS_TABLE}
+    JOIN encyclopedia_entries AS e ON e.id = {FTS_TABLE}.rowid / {SECTION_SLOTS}
+    WHERE {FTS_TABLE} MATCH :match AND (:category IS NULL OR e.category = :category)
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+
+async def search_encyclopedia(
+    db: AsyncSession, match: str, category: Optional[EncyclopediaCategory], limit: int, offset: int
+) -> List[Dict[str, Any]]:
+    # The Enum column stores member names, so filter and decode by name
+    params = {"match": match, "category": category.name if category else None, "limit": limit, "offset": offset}
+    rows = await db.execute(_SEARCH, params)
+    return [
+        {
+            "entry_id": entry_id,
+            "category": EncyclopediaCategory[category],
+            "group_name": group_name,
+            "section": section,
+            "snippet": _highlight(snippet),
+            # bm25() is lower-is-better; flip it so clients sort descending
+            "score": round(-rank, 6),
+        }
+        for entry_id, category, group_name, section, snippet, rank in rows
+    ]
@@ -0,0 +1,161 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from threading import RLock
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import Friendship, FriendshipStatus
+
+
+class FriendGraph:
+    """Adjacency index of ACCEPTED friendships.
+
+    Friendship rows are directed (requester -> addressee) but an accepted
+    friendship is mutual, so each edge is stored on both users. Every user's
+    friends are a sorted array of 32-bit ids: listing is a dict lookup, a
+    membership test is a bisect and mutual friends are an intersection of two
+    sorted arrays.
+
+    "People you may know" (friends of friends ranked by mutual count) is
+    cached per user. An edge change only affects the suggestions of its two
+    ends and their friends, so just those entries are dropped and rebuilt on
+    the next read.
+    """
+
+    SUGGESTIONS_CACHED = 50
+
+    def __init__(self):
+        self._adjacency: Dict[int, array] = {}
+        self._suggestions: Dict[int, List[Tuple[int, int]]] = {}
+        self._lock = RLock()
+
+    def load(self, edges: Iterable[Tuple[int, int]]) -> None:
+        adjacency: Dict[int, set] = {}
+        for user_id, friend_id in edges:
+            adjacency.setdefault(user_id, set()).add(friend_id)
+            adjacency.setdefault(friend_id, set()).add(user_id)
+        with self._lock:
+            self._adjacency = {user_id: array("i", sorted(friends)) for user_id, friends in adjacency.items()}
+            self._suggestions.clear()
+
+    @staticmethod
+    def _contains(friends: array, user_id: int) -> bool:
+        i = bisect_left(friends, user_id)
+        return i < len(friends) and friends[i] == user_id
+
+    def _link(self, user_id: int, friend_id: int) -> bool:
+        friends = self._adjacency.setdefault(user_id, array("i"))
+        i = bisect_left(friends, friend_id)
+        if i < len(friends) and friends[i] == friend_id:
+            return False
+        friends.insert(i, friend_id)
+        return True
+
+    def _unlink(self, user_id: int, friend_id: int) -> bool:
+        friends = self._adjacency.get(user_id)
+        if friends is None or not self._contains(friends, friend_id):
+            return False
+        friends.pop(bisect_left(friends, friend_id))
+        return True
+
+    def _invalidate(self, user_id: int, friend_id: int) -> None:
+        for affected in (user_id, friend_id):
+            self._suggestions.pop(affected, None)
+            for neighbour in self._adjacency.get(affected, ()):
+                self._suggestions.pop(neighbour, None)
+
+    def add(self, user_id: int, friend_id: int) -> None:
+        with self._lock:
+            if self._link(user_id, friend_id) | self._link(friend_id, user_id):
+                self._invalidate(user_id, friend_id)
+
+    def remove(self, user_id: int, friend_id: int) -> None:
+        with self._lock:
+            # Invalidate before unlinking so the old neighbours are still reachable
+            if self.are_friends(user_id, friend_id):
+                self._invalidate(user_id, friend_id)
+            self._unlink(user_id, friend_id)
+            self._unlink(friend_id, user_id)
+
+    def friends(self, user_id: int) -> List[int]:
+        with self._lock:
+            return list(self._adjacency.get(user_id, ()))
+
+    def are_friends(self, user_id: int, friend_id: int) -> bool:
+        with self._lock:
+            return self._contains(self._adjacency.get(user_id, array("i")), friend_id)
+
+    def mutual(self, user_id: int, other_id: int) -> List[int]:
+        with self._lock:
+            small = self._adjacency.get(user_id, array("i"))
+            large = self._adjacency.get(other_id, array("i"))
+            if len(small) > len(large):
+                small, large = large, small
+            if len(large) > 16 * len(small):
+                # Very uneven degrees: probe the short array into the long one, O(s log l)
+                return [friend_id for friend_id in small if self._contains(large, friend_id)]
+            return sorted(set(small).intersection(large))
+
+    def _compute_suggestions(self, user_id: int) -> List[Tuple[int, int]]:
+        friends = self._adjacency.get(user_id, ())
+        counts = Counter()
+        for friend_id in friends:
+            counts.update(self._adjacency.get(friend_id, ()))
+        counts.pop(user_id, None)
+        for friend_id in friends:
+            counts.pop(friend_id, None)
+        best = counts.most_common(self.SUGGESTIONS_CACHED)
+        best.sort(key=lambda item: (-item[1], item[0]))
+        return best
+
+    def suggestions(self, user_id: int, limit: int) -> List[Tuple[int, int]]:
+        """Up to `limit` (user_id, mutual_count) pairs, most mutual friends first."""
+        with self._lock:
+            cached = self._suggestions.get(user_id)
+            if cached is None:
+                cached = self._suggestions[user_id] = self._compute_suggestions(user_id)
+            return cached[:limit]
+
+
+friend_graph = FriendGraph()
+
+
+async def load_friend_graph(db: AsyncSession) -> FriendGraph:
+    edges = await db.execute(
+        select(Friendship.user_id, Friendship.friend_id).where(Friendship.status == FriendshipStatus.ACCEPTED)
+    )
+    friend_graph.load(edges.all())
+    return friend_graph
+
+
+# ORM writes to Friendship keep the graph current once they commit. Core
+# statements bypass session events and must update friend_graph themselves.
+@event.listens_for(Session, "after_flush")
+def _track_friendship_writes(session, flush_context):
+    changes = [
+        (obj.user_id, obj.friend_id, obj.status == FriendshipStatus.ACCEPTED)
+        for obj in chain(session.new, session.dirty)
+        if isinstance(obj, Friendship)
+    ]
+    changes += [(obj.user_id, obj.friend_id, False) for obj in session.deleted if isinstance(obj, Friendship)]
+    if changes:
+        session.info.setdefault("friendship_changes", []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    for user_id, friend_id, accepted in session.info.pop("friendship_changes", ()):
+        if accepted:
+            friend_graph.add(user_id, friend_id)
+        else:
+            friend_graph.remove(user_id, friend_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("friendship_changes", None)
@@ -0,0 +1,106 @@
+from threading import RLock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.controllers.lesson_cache import on_lessons_changed
+
+
+class PartScore(NamedTuple):
+    part: Optional[str]
+    correct: int
+    total: int
+
+
+class GradeResult(NamedTuple):
+    score: int
+    max_score: int
+    xp_awarded: int
+    parts: List[PartScore]
+
+    @property
+    def correct(self) -> bool:
+        return bool(self.max_score) and self.score == self.max_score
+
+
+class LessonGrader:
+    """A lesson answer key flattened into parallel tuples for fast scoring.
+
+    Multi-part keys ({"part1": {"q0": 2, ...}, ...}) become one entry per part;
+    flat keys ({"q0": 2, ...}) become a single part with key None. Questions
+    without a correct answer are left out of the score.
+    """
+
+    __slots__ = ("lesson_id", "xp_reward", "parts", "max_score")
+
+    def __init__(self, lesson_id: int, xp_reward: int, parts: Tuple[Tuple[Optional[str], Tuple[str, ...], Tuple[Any, ...]], ...]):
+        self.lesson_id = lesson_id
+        self.xp_reward = xp_reward
+        self.parts = parts
+        self.max_score = sum(len(question_keys) for _, question_keys, _ in parts)
+
+    def grade(self, answers: Dict[str, Any]) -> GradeResult:
+        score = 0
+        part_scores = []
+        for part_key, question_keys, expected in self.parts:
+            submitted = answers if part_key is None else answers.get(part_key)
+            correct = 0
+            if isinstance(submitted, dict):
+                for question_key, answer in zip(question_keys, expected):
+                    if submitted.get(question_key) == answer:
+                        correct += 1
+            score += correct
+            part_scores.append(PartScore(part_key, correct, len(question_keys)))
+        # Nothing to grade earns nothing here: such lessons are completed through an explicit claim
+        xp_awarded = (self.xp_reward * score) // self.max_score if self.max_score else 0
+        return GradeResult(score, self.max_score, xp_awarded, part_scores)
+
+
+def _compile_part(part_key: Optional[str], questions: Dict[str, Any]):
+    graded = [(key, value) for key, value in questions.items() if value is not None]
+    return part_key, tuple(key for key, _ in graded), tuple(value for _, value in graded)
+
+
+def compile_answer_key(lesson_id: int, answer_key: Dict[str, Any], xp_reward: Optional[int]) -> LessonGrader:
+    answer_key = answer_key or {}
+    if answer_key and all(isinstance(value, dict) for value in answer_key.values()):
+        parts = tuple(_compile_part(part_key, questions) for part_key, questions in answer_key.items())
+    else:
+        parts = (_compile_part(None, answer_key),) if answer_key else ()
+    return LessonGrader(lesson_id, xp_reward or 0, parts)
+
+
+class GraderRegistry:
+    """Compiled graders for every lesson, loaded in one read and kept until a lesson changes."""
+
+    def __init__(self):
+        self._graders: Optional[Dict[int, LessonGrader]] = None
+        self._lock = RLock()
+        self.generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._graders is not None
+
+    def get(self, lesson_id: int) -> Optional[LessonGrader]:
+        graders = self._graders
+        return graders.get(lesson_id) if graders is not None else None
+
+    def load(self, rows: Iterable[Tuple[int, Dict[str, Any], Optional[int]]], generation: int) -> Dict[int, LessonGrader]:
+        """Compile ``rows``; they are kept only if no invalidation happened since ``generation``.
+
+        The compiled graders are returned either way, so the caller can still
+        answer from the rows it just read.
+        """
+        graders = {lesson_id: compile_answer_key(lesson_id, answer_key, xp_reward) for lesson_id, answer_key, xp_reward in rows}
+        with self._lock:
+            if generation == self.generation:
+                self._graders = graders
+        return graders
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._graders = None
+            self.generation += 1
+
+
+grader_registry = GraderRegistry()
+on_lessons_changed(grader_registry.invalidate)
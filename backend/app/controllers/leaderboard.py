@@ -0,0 +1,310 @@
+import asyncio
+import logging
+from datetime import datetime
+from threading import RLock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controllers.ranking import RankedSet
+from app.models.models import Leaderboard, LeaderboardEntry, LeaderboardType, TriviaEntry, User, XPTransaction
+from app.utils.weeks import iso_week_id, week_bounds
+
+logger = logging.getLogger(__name__)
+
+# Sorts before every real (score, user_id) key with the same score
+_FIRST = float("-inf")
+# Rows per INSERT when persisting a board
+_INSERT_BATCH = 1000
+
+
+class ScoreBoard:
+    """Live ranking of users by score, highest first.
+
+    Keys are (-score, user_id) in a RankedSet, so rank, top-N and
+    "users around me" are O(log n) (+ the entries returned). Ties share a
+    rank: a user's rank is one plus the number of users with a higher score.
+    """
+
+    def __init__(self):
+        self._ranked = RankedSet()
+        self._scores: Dict[int, int] = {}
+        self._names: Dict[int, str] = {}
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._scores
+
+    def load(self, rows: Iterable[Tuple[int, Optional[str], Optional[int]]]) -> None:
+        with self._lock:
+            self._ranked = RankedSet()
+            self._scores.clear()
+            self._names.clear()
+            for user_id, name, score in rows:
+                self.set_score(user_id, score or 0, name)
+
+    def set_score(self, user_id: int, score: int, name: Optional[str] = None) -> None:
+        with self._lock:
+            previous = self._scores.get(user_id)
+            if name is not None:
+                self._names[user_id] = name
+            if previous == score:
+                return
+            if previous is not None:
+                self._ranked.remove((-previous, user_id))
+            self._ranked.add((-score, user_id))
+            self._scores[user_id] = score
+
+    def add_score(self, user_id: int, delta: int, name: Optional[str] = None) -> None:
+        with self._lock:
+            if not delta:
+                return
+            # A user the board has not seen yet (registered since it was loaded) starts from zero
+            self.set_score(user_id, self._scores.get(user_id, 0) + delta, name)
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            score = self._scores.pop(user_id, None)
+            self._names.pop(user_id, None)
+            if score is not None:
+                self._ranked.remove((-score, user_id))
+
+    def score(self, user_id: int) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    def name(self, user_id: int) -> Optional[str]:
+        return self._names.get(user_id)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return self._ranked.count_below((-score, _FIRST)) + 1
+
+    def _entries(self, start: int, count: int) -> List[Dict[str, Any]]:
+        entries = []
+        rank = previous = None
+        for position, (negative_score, user_id) in enumerate(self._ranked.iter_from(start, count), start=start):
+            if negative_score != previous:
+                # First user in a tie group: its rank needs one O(log n) lookup at most
+                rank = position + 1 if rank is not None else self._ranked.count_below((negative_score, _FIRST)) + 1
+                previous = negative_score
+            entries.append({"rank": rank, "user_id": user_id, "name": self._names.get(user_id), "score": -negative_score})
+        return entries
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._entries(0, limit)
+
+    def rank_among(self, user_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Rank just `user_ids` against each other: one dict lookup per user plus a sort."""
+        with self._lock:
+            known = sorted((-self._scores[user_id], user_id) for user_id in set(user_ids) if user_id in self._scores)
+            entries = []
+            for position, (negative_score, user_id) in enumerate(known, start=1):
+                rank = entries[-1]["rank"] if entries and entries[-1]["score"] == -negative_score else position
+                entries.append({"rank": rank, "user_id": user_id, "name": self._names.get(user_id), "score": -negative_score})
+            return entries
+
+    def around(self, user_id: int, radius: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return []
+            position = self._ranked.count_below((-score, user_id))
+            start = max(position - radius, 0)
+            return self._entries(start, position - start + radius + 1)
+
+
+xp_leaderboard = ScoreBoard()
+
+
+async def load_xp_leaderboard(db: AsyncSession) -> ScoreBoard:
+    xp_leaderboard.load((await db.execute(select(User.id, User.name, User.xp))).all())
+    return xp_leaderboard
+
+
+async def find_leaderboard(db: AsyncSession, board_type: LeaderboardType, week_id: str) -> Optional[Leaderboard]:
+    start, _ = week_bounds(week_id)
+    return await db.scalar(
+        select(Leaderboard).where(Leaderboard.type == board_type, Leaderboard.start_date == start)
+    )
+
+
+async def frozen_entries(db: AsyncSession, board_type: LeaderboardType, week_id: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """Ranked entries of a persisted weekly board, or None if there is none."""
+    leaderboard = await find_leaderboard(db, board_type, week_id)
+    if leaderboard is None:
+        return None
+    rows = (await db.execute(
+        select(LeaderboardEntry.user_id, User.name, LeaderboardEntry.score)
+        .join(User, User.id == LeaderboardEntry.user_id)
+        .where(LeaderboardEntry.leaderboard_id == leaderboard.id)
+        .order_by(LeaderboardEntry.score.desc(), LeaderboardEntry.user_id)
+        .limit(limit)
+    )).all()
+    entries = []
+    for position, (user_id, name, score) in enumerate(rows, start=1):
+        rank = entries[-1]["rank"] if entries and entries[-1]["score"] == score else position
+        entries.append({"rank": rank, "user_id": user_id, "name": name, "score": score})
+    return entries
+
+
+async def snapshot_leaderboard(
+    db: AsyncSession,
+    board: ScoreBoard,
+    board_type: LeaderboardType,
+    week_id: str,
+    size: int,
+) -> Leaderboard:
+    """Persist the board's top `size` entries as the durable board for `week_id`.
+
+    Repeated snapshots in the same week replace that week's entries; once the
+    week is over its last snapshot stays as the weekly record.
+    """
+    leaderboard = await find_leaderboard(db, board_type, week_id)
+    if leaderboard is None:
+        start, end = week_bounds(week_id)
+        leaderboard = Leaderboard(type=board_type, start_date=start, end_date=end)
+        db.add(leaderboard)
+        await db.flush()
+    else:
+        await db.execute(delete(LeaderboardEntry).where(LeaderboardEntry.leaderboard_id == leaderboard.id))
+    rows = [
+        {"leaderboard_id": leaderboard.id, "user_id": entry["user_id"], "score": entry["score"]}
+        for entry in board.top(size)
+    ]
+    for i in range(0, len(rows), _INSERT_BATCH):
+        await db.execute(insert(LeaderboardEntry), rows[i:i + _INSERT_BATCH])
+    await db.commit()
+    return leaderboard
+
+
+async def weekly_xp_board(db: AsyncSession, week_id: str) -> ScoreBoard:
+    """XP earned during `week_id`, per user, summed from xp_transactions."""
+    start, end = week_bounds(week_id)
+    board = ScoreBoard()
+    board.load((await db.execute(
+        select(XPTransaction.user_id, User.name, func.sum(XPTransaction.value))
+        .join(User, User.id == XPTransaction.user_id)
+        .where(XPTransaction.date >= start, XPTransaction.date < end)
+        .group_by(XPTransaction.user_id, User.name)
+    )).all())
+    return board
+
+
+async def snapshot_weekly_xp(db: AsyncSession, week_id: str, size: int) -> Leaderboard:
+    """Persist the top `size` earners of `week_id` as that week's XP board."""
+    return await snapshot_leaderboard(db, await weekly_xp_board(db, week_id), LeaderboardType.XP, week_id, size)
+
+
+async def run_xp_snapshots(session_factory, interval: float, size: int) -> None:
+    """Background task: snapshot this week's XP board every `interval` seconds.
+
+    When the week rolls over, the closed week gets one last snapshot so XP
+    earned after its previous snapshot still counts.
+    """
+    week_id = iso_week_id()
+    while True:
+        await asyncio.sleep(interval)
+        current = iso_week_id()
+        try:
+            async with session_factory() as db:
+                if current != week_id:
+                    await snapshot_weekly_xp(db, week_id, size)
+                    week_id = current
+                await snapshot_weekly_xp(db, current, size)
+        except Exception as e:
+            logger.warning("XP leaderboard snapshot failed", extra={"error": str(e)})
+
+
+class TriviaBoards:
+    """Live trivia boards for the weeks that are still open.
+
+    Each submitted entry updates its week's ScoreBoard in place; a user's
+    weekly score is their best entry. When a week closes its board is frozen
+    into Leaderboard rows and dropped from memory.
+    """
+
+    def __init__(self):
+        self._weeks: Dict[str, ScoreBoard] = {}
+
+    def week(self, week_id: str) -> Optional[ScoreBoard]:
+        return self._weeks.get(week_id)
+
+    def open_weeks(self) -> List[str]:
+        return sorted(self._weeks)
+
+    def load_week(self, week_id: str, rows: Iterable[Tuple[int, Optional[str], Optional[int]]]) -> ScoreBoard:
+        board = ScoreBoard()
+        board.load(rows)
+        self._weeks[week_id] = board
+        return board
+
+    def record(self, user_id: int, week_id: str, score: int, name: Optional[str] = None) -> None:
+        board = self._weeks.setdefault(week_id, ScoreBoard())
+        best = board.score(user_id)
+        if best is None or score > best:
+            board.set_score(user_id, score, name or xp_leaderboard.name(user_id))
+
+    def discard(self, week_id: str) -> None:
+        self._weeks.pop(week_id, None)
+
+
+trivia_boards = TriviaBoards()
+
+
+async def freeze_trivia_week(db: AsyncSession, week_id: str) -> Optional[Leaderboard]:
+    """Persist every entry of a closed week's board, then release it."""
+    board = trivia_boards.week(week_id)
+    if board is None:
+        return None
+    leaderboard = await snapshot_leaderboard(db, board, LeaderboardType.TRIVIA, week_id, len(board))
+    trivia_boards.discard(week_id)
+    return leaderboard
+
+
+async def freeze_closed_trivia_weeks(db: AsyncSession, current: Optional[str] = None) -> List[str]:
+    current = current or iso_week_id()
+    # ISO week ids sort chronologically
+    closed = [week_id for week_id in trivia_boards.open_weeks() if week_id < current]
+    for week_id in closed:
+        await freeze_trivia_week(db, week_id)
+    return closed
+
+
+async def load_trivia_boards(db: AsyncSession) -> None:
+    """Rebuild the boards of weeks not yet frozen, then freeze any that closed while we were down."""
+    current = iso_week_id()
+    for week_id in (await db.scalars(select(TriviaEntry.week_id).distinct())).all():
+        try:
+            if week_id < current and await find_leaderboard(db, LeaderboardType.TRIVIA, week_id) is not None:
+                continue
+        except ValueError:
+            logger.warning("Skipping trivia entries with malformed week_id", extra={"week_id": week_id})
+            continue
+        rows = (await db.execute(
+            select(TriviaEntry.user_id, User.name, func.max(TriviaEntry.score))
+            .join(User, User.id == TriviaEntry.user_id)
+            .where(TriviaEntry.week_id == week_id)
+            .group_by(TriviaEntry.user_id, User.name)
+        )).all()
+        trivia_boards.load_week(week_id, rows)
+    await freeze_closed_trivia_weeks(db, current)
+
+
+async def run_trivia_rollover(session_factory) -> None:
+    """Background task: freeze each week's trivia board as soon as the week closes."""
+    while True:
+        _, end = week_bounds(iso_week_id())
+        # Wake just after the boundary, and at least hourly so a failed freeze is retried
+        await asyncio.sleep(min((end - datetime.utcnow()).total_seconds() + 1, 3600))
+        try:
+            async with session_factory() as db:
+                await freeze_closed_trivia_weeks(db)
+        except Exception as e:
+            logger.warning("Trivia leaderboard freeze failed", extra={"error": str(e)})
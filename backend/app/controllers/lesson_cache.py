@@ -0,0 +1,103 @@
+from itertools import chain
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, List
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.models import Lesson
+
+CATALOG_KEY = ("catalog",)
+SUMMARY_KEY = ("summary",)
+
+
+def slug_key(slug: str):
+    return ("slug", slug)
+
+
+def parts_key(slug: str):
+    return ("parts", slug)
+
+
+class LessonCatalogCache:
+    """In-process TTL cache for serialized lesson payloads.
+
+    Entries are tagged with the generation they were loaded under; a write that
+    lands while a request is still reading from the database bumps the
+    generation, so the stale result is dropped instead of being cached.
+    """
+
+    def __init__(self, ttl: int, maxsize: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = RLock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._cache[key] = value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._cache),
+                "ttl": self._cache.ttl,
+            }
+
+
+lesson_cache = LessonCatalogCache(ttl=settings.CACHE_TTL, maxsize=settings.LESSON_CACHE_SIZE)
+
+# Callbacks run whenever a committed transaction touched a Lesson row
+_listeners: List[Callable[[], None]] = [lesson_cache.invalidate]
+
+
+def on_lessons_changed(callback: Callable[[], None]) -> Callable[[], None]:
+    _listeners.append(callback)
+    return callback
+
+
+def invalidate_lessons() -> None:
+    for callback in _listeners:
+        callback()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_lesson_writes(session, flush_context):
+    if any(isinstance(obj, Lesson) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["lessons_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("lessons_changed", False):
+        invalidate_lessons()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("lessons_changed", None)
@@ -0,0 +1,49 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from app.models.models import Lesson
+
+
+class LessonPartIndex(NamedTuple):
+    """Manifest plus one ready-to-send payload per part, built once per lesson."""
+    manifest: Any
+    parts: List[Any]
+
+    def part(self, number: int) -> Optional[Any]:
+        # Parts are numbered from 1 to match the part{n} answer key entries
+        if 1 <= number <= len(self.parts):
+            return self.parts[number - 1]
+        return None
+
+
+def lesson_parts(content: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if "parts" in content:
+        return content["parts"]
+    # Single lesson structure: expose the flat question list as one part
+    if content.get("questions"):
+        return [{"id": 1, "questions": content["questions"]}]
+    return []
+
+
+def build_part_index(lesson: Lesson, encode: Callable[[Any], Any]) -> LessonPartIndex:
+    parts = lesson_parts(lesson.content or {})
+    manifest = {
+        "lesson_id": lesson.id,
+        "slug": lesson.slug,
+        "title": lesson.title,
+        "part_count": len(parts),
+        "parts": [
+            {
+                "number": number,
+                "id": part.get("id"),
+                "title": part.get("title"),
+                "description": part.get("description"),
+                "question_count": len(part.get("questions", [])),
+            }
+            for number, part in enumerate(parts, start=1)
+        ],
+    }
+    payloads = [
+        encode({"lesson_id": lesson.id, "slug": lesson.slug, "number": number, "part_count": len(parts), "part": part})
+        for number, part in enumerate(parts, start=1)
+    ]
+    return LessonPartIndex(manifest=encode(manifest), parts=payloads)
@@ -0,0 +1,117 @@
+from threading import RLock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import re
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controllers.lesson_cache import on_lessons_changed
+from app.models.models import Lesson, LessonSlugAlias
+
+
+def slugify(title):
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+
+
+class ResolvedLesson(NamedTuple):
+    id: int
+    title: str
+    slug: str
+    title_slug: str
+
+
+class LessonAliases:
+    """One build of the alias table: slug, title slug or old slug to lesson id."""
+
+    __slots__ = ("aliases", "lessons")
+
+    def __init__(self, aliases: Dict[str, int], lessons: List[ResolvedLesson]):
+        self.aliases = aliases
+        self.lessons = lessons
+
+    def resolve(self, value: str) -> Optional[int]:
+        lesson_id = self.aliases.get(value)
+        if lesson_id is None:
+            # Accept titles or loosely formatted slugs ("Festivals of Faith", "festivals_of_faith")
+            lesson_id = self.aliases.get(slugify(value))
+        return lesson_id
+
+
+class LessonResolver:
+    """Maps slugs, slugified titles and previously seen slugs to lesson ids.
+
+    Lookups are plain dict hits; the table is rebuilt from an (id, slug,
+    title) read plus the persisted lesson_slug_aliases after any lesson
+    change. Aliases from earlier builds are also kept as history, so renamed
+    lessons resolve by their old slug as long as the lesson exists and no
+    current lesson claims the alias.
+    """
+
+    def __init__(self):
+        self._table: Optional[LessonAliases] = None
+        self._history: Dict[str, int] = {}
+        self._lock = RLock()
+        self.generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._table is not None
+
+    @property
+    def table(self) -> Optional[LessonAliases]:
+        return self._table
+
+    @property
+    def lessons(self) -> List[ResolvedLesson]:
+        table = self._table
+        return table.lessons if table is not None else []
+
+    def load(
+        self,
+        rows: Iterable[Tuple[int, str, str]],
+        generation: int,
+        old_slugs: Iterable[Tuple[str, int]] = (),
+    ) -> LessonAliases:
+        """Build the table from ``rows`` and persisted ``(old slug, lesson id)`` pairs.
+
+        It is kept only if no invalidation happened since ``generation``, but
+        returned either way, so the caller can still resolve against the rows
+        it just read.
+        """
+        lessons = [ResolvedLesson(lesson_id, title, slug, slugify(title)) for lesson_id, slug, title in rows]
+        ids = {lesson.id for lesson in lessons}
+        with self._lock:
+            aliases = {alias: lesson_id for alias, lesson_id in old_slugs if lesson_id in ids}
+            aliases.update((alias, lesson_id) for alias, lesson_id in self._history.items() if lesson_id in ids)
+            # Title slugs, then real slugs, so a current slug always wins
+            aliases.update((lesson.title_slug, lesson.id) for lesson in lessons)
+            aliases.update((lesson.slug, lesson.id) for lesson in lessons)
+            table = LessonAliases(aliases, lessons)
+            if generation == self.generation:
+                self._history = aliases
+                self._table = table
+        return table
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._table = None
+            self.generation += 1
+
+    def resolve(self, value: str) -> Optional[int]:
+        table = self._table
+        return table.resolve(value) if table is not None else None
+
+
+lesson_resolver = LessonResolver()
+on_lessons_changed(lesson_resolver.invalidate)
+
+
+async def load_lesson_resolver(db: AsyncSession) -> LessonAliases:
+    table = lesson_resolver.table
+    if table is None:
+        generation = lesson_resolver.generation
+        rows = (await db.execute(select(Lesson.id, Lesson.slug, Lesson.title))).all()
+        old_slugs = (await db.execute(select(LessonSlugAlias.slug, LessonSlugAlias.lesson_id))).all()
+        # Resolve against these rows even if an invalidation meanwhile kept them out of the resolver
+        table = lesson_resolver.load(rows, generation, old_slugs)
+    return table
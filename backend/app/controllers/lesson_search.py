@@ -0,0 +1,145 @@
+import heapq
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from threading import RLock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controllers.lesson_cache import on_lessons_changed
+from app.controllers.lesson_parts import lesson_parts
+from app.models.models import Lesson
+from app.utils.text import fold_words
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the this to was what which who with".split()
+)
+# Question wording counts most, then the answer options, then the explanation
+FIELD_WEIGHTS = (("questionText", 3.0), ("answers", 1.5), ("explanation", 1.0))
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [word for word in fold_words(text) if word not in _STOPWORDS]
+
+
+class QuestionRef(NamedTuple):
+    slug: str
+    title: str
+    part: int  # 1-based, as in /lessons/slug/{slug}/parts/{n}
+    question: int  # 0-based index within the part
+    question_text: str
+
+
+def _fields(question: Dict[str, Any]) -> Iterable[Tuple[str, float]]:
+    for field, weight in FIELD_WEIGHTS:
+        value = question.get(field)
+        if field == "answers":
+            value = " ".join(answer.get("text", "") for answer in value or () if isinstance(answer, dict))
+        if isinstance(value, str) and value:
+            yield value, weight
+
+
+class LessonSearchIndex:
+    """In-memory inverted index over every lesson question.
+
+    Each question (with its answer options and explanation) is one document.
+    BM25 weights are computed per (term, question) when the index is built, so
+    a query only sums precomputed postings for its terms. The sorted
+    vocabulary also serves prefix terms ("ramad*").
+    """
+
+    def __init__(self, questions: List[QuestionRef], postings: Dict[str, List[Tuple[int, float]]]):
+        self.questions = questions
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, lessons: Iterable[Tuple[str, str, Dict[str, Any]]]) -> "LessonSearchIndex":
+        questions: List[QuestionRef] = []
+        frequencies: List[Dict[str, float]] = []
+        for slug, title, content in lessons:
+            for part_number, part in enumerate(lesson_parts(content or {}), start=1):
+                for index, question in enumerate(part.get("questions", [])):
+                    if not isinstance(question, dict):
+                        continue
+                    counts: Dict[str, float] = defaultdict(float)
+                    for text, weight in _fields(question):
+                        for term in tokenize(text):
+                            counts[term] += weight
+                    questions.append(QuestionRef(slug, title, part_number, index, question.get("questionText", "")))
+                    frequencies.append(counts)
+
+        total = len(questions)
+        lengths = [sum(counts.values()) for counts in frequencies]
+        average = (sum(lengths) / total) if total else 0.0
+        document_frequency: Dict[str, int] = defaultdict(int)
+        for counts in frequencies:
+            for term in counts:
+                document_frequency[term] += 1
+        idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc, counts in enumerate(frequencies):
+            norm = K1 * (1 - B + B * lengths[doc] / average) if average else K1
+            for term, tf in counts.items():
+                postings[term].append((doc, idf[term] * tf * (K1 + 1) / (tf + norm)))
+        return cls(questions, dict(postings))
+
+    def _expand(self, term: str) -> List[str]:
+        start = bisect_left(self.vocabulary, term)
+        end = bisect_left(self.vocabulary, term + "￿")
+        return self.vocabulary[start:end]
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        scores: Dict[int, float] = defaultdict(float)
+        for raw in query.split():
+            prefix = raw.endswith("*")
+            for term in tokenize(raw):
+                for expanded in (self._expand(term) if prefix else (term,)):
+                    for doc, weight in self.postings.get(expanded, ()):
+                        scores[doc] += weight
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [{**self.questions[doc]._asdict(), "score": round(score, 4)} for doc, score in best]
+
+
+class LessonSearch:
+    """The current question index, built in one read and dropped when a lesson changes."""
+
+    def __init__(self):
+        self._index: Optional[LessonSearchIndex] = None
+        self._lock = RLock()
+        self.generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def load(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]], generation: int) -> None:
+        index = LessonSearchIndex.build(rows)
+        with self._lock:
+            if generation == self.generation:
+                self._index = index
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        index = self._index
+        return index.search(query, limit) if index is not None else []
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self.generation += 1
+
+
+lesson_search = LessonSearch()
+on_lessons_changed(lesson_search.invalidate)
+
+
+async def load_lesson_search(db: AsyncSession) -> LessonSearch:
+    if not lesson_search.loaded:
+        generation = lesson_search.generation
+        rows = (await db.execute(select(Lesson.slug, Lesson.title, Lesson.content))).all()
+        lesson_search.load(rows, generation)
+    return lesson_search
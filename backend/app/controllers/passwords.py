@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Stored for accounts that sign in through OAuth only. It is not a hash any
+# scheme recognises, so no password ever verifies against it.
+NO_PASSWORD = "!oauth-only"
+# What OAuth accounts used to be created with, before NO_PASSWORD
+LEGACY_OAUTH_PASSWORD = "oauth_placeholder"
+
+
+def _init_worker() -> None:
+    # bcrypt in the pool runs at lower priority than the process serving requests
+    try:
+        os.nice(10)
+    except OSError:
+        pass
+
+
+def _noop() -> None:
+    pass
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many hashes are already queued; the caller should retry later."""
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification in a dedicated, bounded process pool.
+
+    Each bcrypt call is ~200ms of CPU. Running it in worker processes keeps it
+    off the event loop and out of the shared threadpool, and at most
+    ``max_pending`` calls may be queued or running: beyond that requests fail
+    fast with PasswordPoolBusy instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Bumped per pool, so only the first caller to see a pool break replaces it
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        with self._lock:
+            self._start()
+
+    def _start(self) -> None:
+        if self._executor is not None:
+            return
+        # spawn, not fork: the server process already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._generation += 1
+        # Start the workers now rather than on the first login
+        for _ in range(self.workers):
+            self._executor.submit(_noop)
+
+    def stop(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # Don't block the event loop on worker exit; queued calls are cancelled
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or self._executor is None:
+                # Already replaced (or stopped) by someone else
+                return
+            executor, self._executor = self._executor, None
+            self._start()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args) -> Any:
+        with self._lock:
+            executor, generation = self._executor, self._generation
+        if executor is None:
+            # No pool (scripts, tests without lifespan): the threadpool still keeps bcrypt off the loop
+            return await run_in_threadpool(fn, *args)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM kill etc.): replace the pool and answer this call from the threadpool
+            logger.warning("Password process pool broke, restarting it")
+            self._restart(generation)
+            return await run_in_threadpool(fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        # Sentinels and anything else that is not a known hash fail without touching the pool
+        if not password_hash or not pwd_context.identify(password_hash):
+            return False
+        return await self._run(_verify, password, password_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_WORKERS, settings.PASSWORD_MAX_PENDING)
+
@@ -0,0 +1,125 @@
+from typing import NamedTuple
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.models import UserLessonProgress, XPTransaction
+
+
+def _progress_upsert(db: AsyncSession, user_id: int, lesson_id: int, xp_earned: int, completed: bool):
+    stmt = dialect_insert(db, UserLessonProgress).values(
+        user_id=user_id,
+        lesson_id=lesson_id,
+        completed_at=func.now() if completed else None,
+        best_score=xp_earned,
+        attempts=1,
+    )
+    return stmt, {
+        "attempts": UserLessonProgress.attempts + 1,
+        "best_score": case(
+            (stmt.excluded.best_score > UserLessonProgress.best_score, stmt.excluded.best_score),
+            else_=UserLessonProgress.best_score,
+        ),
+        "completed_at": func.coalesce(UserLessonProgress.completed_at, stmt.excluded.completed_at),
+    }
+
+
+class AttemptOutcome(NamedTuple):
+    # How far the attempt raised best_score: the only XP it may earn
+    xp: int
+    # Whether this attempt is the one that completed the lesson
+    first_completion: bool
+
+
+async def _raise_best_score(db: AsyncSession, user_id: int, lesson_id: int, xp_earned: int) -> int:
+    """Raise best_score to ``xp_earned`` and return by how much.
+
+    A compare-and-set on the previous value, so racing attempts split an
+    improvement between them instead of each claiming it in full.
+    """
+    progress = UserLessonProgress.__table__
+    key = (progress.c.user_id == user_id) & (progress.c.lesson_id == lesson_id)
+    while True:
+        row = (await db.execute(select(progress.c.best_score).where(key).with_for_update())).first()
+        if row is None:
+            # No attempts yet: the caller's upsert counts this one
+            stmt = dialect_insert(db, UserLessonProgress).values(
+                user_id=user_id, lesson_id=lesson_id, best_score=xp_earned, attempts=0
+            ).on_conflict_do_nothing(index_elements=["user_id", "lesson_id"])
+            if (await db.execute(stmt)).rowcount == 1:
+                return xp_earned
+            continue
+        best = row.best_score or 0
+        if xp_earned <= best:
+            return 0
+        result = await db.execute(
+            update(progress)
+            .where(key, func.coalesce(progress.c.best_score, 0) == best)
+            .values(best_score=xp_earned)
+        )
+        if result.rowcount == 1:
+            return xp_earned - best
+
+
+async def record_attempt(db: AsyncSession, user_id: int, lesson_id: int, xp_earned: int, completed: bool) -> AttemptOutcome:
+    """Fold one attempt into the user's progress row; the caller commits.
+
+    Resubmitting never earns the same XP twice: only the amount by which
+    ``xp_earned`` beats the previous best is returned for crediting. A
+    completing attempt goes through claim_completion, so exactly one attempt
+    per user and lesson is reported as the first completion.
+    """
+    xp = await _raise_best_score(db, user_id, lesson_id, xp_earned)
+    if completed and await claim_completion(db, user_id, lesson_id, xp_earned):
+        return AttemptOutcome(xp, True)
+    stmt, changes = _progress_upsert(db, user_id, lesson_id, xp_earned, completed)
+    await db.execute(stmt.on_conflict_do_update(index_elements=["user_id", "lesson_id"], set_=changes))
+    return AttemptOutcome(xp, False)
+
+
+async def claim_completion(db: AsyncSession, user_id: int, lesson_id: int, xp_earned: int) -> bool:
+    """Mark the lesson completed unless it already is.
+
+    The conditional upsert only touches a row that is missing or not yet
+    completed, so of any number of racing requests exactly one sees a
+    changed row.
+    """
+    stmt, changes = _progress_upsert(db, user_id, lesson_id, xp_earned, completed=True)
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "lesson_id"],
+            set_=changes,
+            where=UserLessonProgress.completed_at.is_(None),
+        )
+    )
+    return result.rowcount == 1
+
+
+def backfill_lesson_progress(db: Session) -> int:
+    """One-shot migration of completion state out of xp_transactions.
+
+    Runs only while user_lesson_progress is still empty, so once any progress
+    exists this is a single primary-key probe.
+    """
+    if db.query(UserLessonProgress.user_id).first() is not None:
+        return 0
+    rows = (
+        select(
+            XPTransaction.user_id,
+            XPTransaction.lesson_id,
+            func.min(XPTransaction.date),
+            func.max(XPTransaction.value),
+            func.count(),
+        )
+        .where(XPTransaction.lesson_id.is_not(None))
+        .group_by(XPTransaction.user_id, XPTransaction.lesson_id)
+    )
+    result = db.execute(
+        insert(UserLessonProgress).from_select(
+            ["user_id", "lesson_id", "completed_at", "best_score", "attempts"], rows
+        )
+    )
+    db.commit()
+    return result.rowcount
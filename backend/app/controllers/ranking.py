@@ -0,0 +1,117 @@
+import random
+from typing import Any, Iterator, List, Optional
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        # width[i]: how many positions following next[i] advances
+        self.width = [1] * level
+
+
+class RankedSet:
+    """Indexable skip list of unique, comparable keys.
+
+    Insert, remove, rank (number of keys below a bound) and positional lookup
+    are all O(log n) expected; iterating k keys from a position is O(log n + k).
+    """
+
+    MAX_LEVEL = 32
+
+    def __init__(self, seed: Optional[int] = None):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _path(self, key: Any):
+        # Rightmost node before `key` on every level, with its position (head = 0)
+        update = [self._head] * self.MAX_LEVEL
+        positions = [0] * self.MAX_LEVEL
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+            update[i] = node
+            positions[i] = position
+        return update, positions
+
+    def add(self, key: Any) -> None:
+        update, positions = self._path(key)
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                # Unused head levels span the whole list
+                self._head.width[i] = self._size + 1
+            self._level = level
+        new = _Node(key, level)
+        position = positions[0] + 1
+        for i in range(level):
+            before = update[i]
+            new.next[i] = before.next[i]
+            new.width[i] = before.width[i] + positions[i] + 1 - position
+            before.next[i] = new
+            before.width[i] = position - positions[i]
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key: Any) -> None:
+        update, _ = self._path(key)
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for i in range(self._level):
+            before = update[i]
+            if before.next[i] is target:
+                before.width[i] += target.width[i] - 1
+                before.next[i] = target.next[i]
+            else:
+                before.width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+
+    def count_below(self, key: Any) -> int:
+        """Number of keys strictly less than `key`."""
+        _, positions = self._path(key)
+        return positions[0]
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        if not 0 <= index < self._size:
+            return None
+        node, position, target = self._head, 0, index + 1
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and position + node.width[i] <= target:
+                position += node.width[i]
+                node = node.next[i]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        node = self._node_at(index)
+        if node is None:
+            raise IndexError(index)
+        return node.key
+
+    def iter_from(self, index: int, count: int) -> Iterator[Any]:
+        node = self._node_at(max(index, 0))
+        while node is not None and count > 0:
+            yield node.key
+            node = node.next[0]
+            count -= 1
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.iter_from(0, self._size)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import time
+from itertools import chain
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.models import TriviaChallenge, TriviaEntry
+
+
+class TriviaSubmission(NamedTuple):
+    week_id: str
+    answers: List[Any]
+    score: int
+
+
+def _normalize(answer: Any) -> Any:
+    # Text answers compare case- and whitespace-insensitively; anything
+    # that is not text or an option index can never be correct
+    if isinstance(answer, str):
+        return answer.strip().casefold()
+    if isinstance(answer, int) and not isinstance(answer, bool):
+        return answer
+    return None
+
+
+def _accepted(question: Any, correct: Any) -> FrozenSet[Any]:
+    accepted = {_normalize(correct)}
+    options = question.get("options") if isinstance(question, dict) else None
+    if isinstance(options, list) and correct in options:
+        # The option index is as good as the option text
+        accepted.add(options.index(correct))
+    accepted.discard(None)
+    return frozenset(accepted)
+
+
+class CompiledChallenge:
+    """A week's challenge ready to serve at peak load.
+
+    The public payload (questions without answers) is encoded once, and the
+    answer key is flattened into one set of accepted answers per question, so
+    grading a submission is a list walk with set lookups.
+    """
+
+    __slots__ = ("week_id", "theme", "payload", "accepted", "max_score")
+
+    def __init__(self, week_id: str, theme: str, questions: List[Any], correct_answers: List[Any]):
+        self.week_id = week_id
+        self.theme = theme
+        self.payload = json.dumps(
+            {"week_id": week_id, "theme": theme, "questions": questions},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        self.accepted = tuple(_accepted(question, correct) for question, correct in zip(questions, correct_answers))
+        self.max_score = len(self.accepted)
+
+    def grade(self, answers: List[Any]) -> int:
+        return sum(1 for accepted, answer in zip(self.accepted, answers) if _normalize(answer) in accepted)
+
+
+def compile_challenge(challenge: TriviaChallenge) -> CompiledChallenge:
+    return CompiledChallenge(challenge.week_id, challenge.theme, challenge.questions or [], challenge.correct_answers or [])
+
+
+class TriviaRegistry:
+    """Compiled challenges by week_id.
+
+    A week is read from the database once; concurrent first requests for the
+    same week wait on a single load instead of each reading the row. Weeks
+    without a challenge are remembered for MISS_TTL seconds.
+    """
+
+    MISS_TTL = 60
+
+    def __init__(self):
+        self._challenges: Dict[str, CompiledChallenge] = {}
+        self._missing: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def get(self, week_id: str) -> Optional[CompiledChallenge]:
+        return self._challenges.get(week_id)
+
+    def put(self, challenge: CompiledChallenge) -> None:
+        self._challenges[challenge.week_id] = challenge
+        self._missing.pop(challenge.week_id, None)
+
+    def discard(self, week_id: str) -> None:
+        self._challenges.pop(week_id, None)
+        self._missing.pop(week_id, None)
+
+    def prune(self, oldest_week_id: str) -> None:
+        """Forget weeks before `oldest_week_id`; ISO week ids sort chronologically."""
+        for cache in (self._challenges, self._missing, self._locks):
+            for week_id in [week_id for week_id in cache if week_id < oldest_week_id]:
+                del cache[week_id]
+
+    async def load(self, db: AsyncSession, week_id: str) -> Optional[CompiledChallenge]:
+        challenge = self._challenges.get(week_id)
+        if challenge is not None:
+            return challenge
+        if self._missing.get(week_id, 0) > time.monotonic():
+            return None
+        async with self._locks.setdefault(week_id, asyncio.Lock()):
+            challenge = self._challenges.get(week_id)
+            if challenge is not None:
+                return challenge
+            row = await db.scalar(select(TriviaChallenge).where(TriviaChallenge.week_id == week_id))
+            if row is None:
+                self._missing[week_id] = time.monotonic() + self.MISS_TTL
+                return None
+            challenge = compile_challenge(row)
+            self.put(challenge)
+            return challenge
+
+
+trivia_registry = TriviaRegistry()
+
+
+async def claim_trivia_entries(db: AsyncSession, submissions: List[Tuple[int, TriviaSubmission]]) -> Dict[Tuple[int, str], int]:
+    """Insert each user's entry for the week unless one already exists.
+
+    One multi-row INSERT ... ON CONFLICT DO NOTHING for the whole batch; the
+    result maps (user_id, week_id) to the new entry id for the rows that were
+    inserted. Repeats, including a second submission within the same batch,
+    are absent from it.
+    """
+    if not submissions:
+        return {}
+    result = await db.execute(
+        dialect_insert(db, TriviaEntry)
+        .values([
+            {"user_id": user_id, "week_id": submission.week_id, "answers": submission.answers, "score": submission.score}
+            for user_id, submission in submissions
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id", "week_id"])
+        .returning(TriviaEntry.user_id, TriviaEntry.week_id, TriviaEntry.id)
+    )
+    return {(user_id, week_id): entry_id for user_id, week_id, entry_id in result}
+
+
+# Edited challenges are recompiled on next use once the change commits
+@event.listens_for(Session, "after_flush")
+def _track_challenge_writes(session, flush_context):
+    weeks = [obj.week_id for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, TriviaChallenge)]
+    if weeks:
+        session.info.setdefault("trivia_weeks_changed", set()).update(weeks)
+
+
+@event.listens_for(Session, "after_commit")
+def _discard_after_commit(session):
+    for week_id in session.info.pop("trivia_weeks_changed", ()):
+        trivia_registry.discard(week_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("trivia_weeks_changed", None)
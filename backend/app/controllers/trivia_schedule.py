@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controllers.trivia import trivia_registry
+from app.database import dialect_insert
+from app.models.models import TriviaChallenge, TriviaQuestion
+from app.utils.weeks import iso_week_id, next_week_id, week_bounds
+
+logger = logging.getLogger(__name__)
+
+
+def build_challenge(week_id: str, bank: Sequence[TriviaQuestion], size: int) -> Optional[Dict[str, Any]]:
+    """Assemble one week's challenge row from the question bank.
+
+    Themes rotate week by week. The week's theme supplies questions first and
+    the other themes top the challenge up to `size`. The shuffle is seeded by
+    week_id, so a given bank always produces the same week.
+    """
+    if not bank:
+        return None
+    themes = sorted({question.theme for question in bank})
+    start, _ = week_bounds(week_id)
+    theme = themes[start.toordinal() // 7 % len(themes)]
+    rng = random.Random(week_id)
+    on_theme = [question for question in bank if question.theme == theme]
+    others = [question for question in bank if question.theme != theme]
+    rng.shuffle(on_theme)
+    rng.shuffle(others)
+    picked = (on_theme + others)[:size]
+    return {
+        "week_id": week_id,
+        "theme": theme,
+        "questions": [{"q": question.question, "options": question.options} for question in picked],
+        "correct_answers": [question.answer for question in picked],
+    }
+
+
+async def schedule_weeks(db: AsyncSession, week_ids: List[str], size: int) -> List[str]:
+    """Persist a challenge for each of `week_ids` that has none yet; returns the weeks created."""
+    existing = set((await db.scalars(select(TriviaChallenge.week_id).where(TriviaChallenge.week_id.in_(week_ids)))).all())
+    missing = [week_id for week_id in week_ids if week_id not in existing]
+    if not missing:
+        return []
+    bank = (await db.scalars(select(TriviaQuestion).order_by(TriviaQuestion.id))).all()
+    rows = [row for row in (build_challenge(week_id, bank, size) for week_id in missing) if row]
+    if not rows:
+        return []
+    # Another worker may be scheduling the same weeks; the first insert wins
+    await db.execute(dialect_insert(db, TriviaChallenge).values(rows).on_conflict_do_nothing(index_elements=["week_id"]))
+    await db.commit()
+    return [row["week_id"] for row in rows]
+
+
+async def prepare_trivia_weeks(db: AsyncSession, weeks_ahead: int, size: int) -> List[str]:
+    """Make sure this week and the next `weeks_ahead` have challenges, then compile this week and next into memory."""
+    current = iso_week_id()
+    week_ids = [current] + [next_week_id(current, weeks) for weeks in range(1, weeks_ahead + 1)]
+    created = await schedule_weeks(db, week_ids, size)
+    for week_id in created:
+        # Core inserts skip the session hooks; clear any remembered miss
+        trivia_registry.discard(week_id)
+    trivia_registry.prune(current)
+    for week_id in week_ids[:2]:
+        await trivia_registry.load(db, week_id)
+    return created
+
+
+async def run_trivia_scheduler(session_factory, weeks_ahead: int, size: int) -> None:
+    """Background task: keep upcoming weeks scheduled and next week's challenge compiled.
+
+    Wakes hourly, and one second after each ISO-week boundary so the new
+    "next week" is compiled long before its own Monday rush.
+    """
+    while True:
+        _, end = week_bounds(iso_week_id())
+        await asyncio.sleep(min((end - datetime.utcnow()).total_seconds() + 1, 3600))
+        try:
+            async with session_factory() as db:
+                await prepare_trivia_weeks(db, weeks_ahead, size)
+        except Exception as e:
+            logger.warning("Trivia scheduling failed", extra={"error": str(e)})
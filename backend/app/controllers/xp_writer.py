@@ -0,0 +1,261 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.controllers.leaderboard import trivia_boards, xp_leaderboard
+from app.controllers.progress import claim_completion, record_attempt
+from app.controllers.trivia import TriviaSubmission, claim_trivia_entries
+from app.models.models import User, XPTransaction
+
+
+class XPAward(NamedTuple):
+    user_id: int
+    xp: int
+    source: str = "lesson"
+    lesson_id: Optional[int] = None
+    trivia_entry_id: Optional[int] = None
+    # First completion only: the award is dropped if the lesson is already completed
+    claim_completion: bool = False
+    # Graded attempt: fold into the user's progress row
+    record_attempt: bool = False
+    completed: bool = False
+    # True increments the streak, False resets it, None leaves it alone
+    streak: Optional[bool] = None
+    # Weekly trivia entry: the award is dropped if the user already submitted that week
+    trivia: Optional[TriviaSubmission] = None
+
+
+async def _apply(db: AsyncSession, award: XPAward, claimed: Dict[Tuple[int, str], int]) -> Optional[int]:
+    """Stage one award in the current transaction, except the users.xp increment.
+
+    Returns the XP actually credited, or None if the award was dropped.
+    """
+    xp, streak = award.xp, award.streak
+    trivia_entry_id = award.trivia_entry_id
+    if award.trivia is not None:
+        # First award per (user, week) takes the entry claimed for the batch
+        trivia_entry_id = claimed.pop((award.user_id, award.trivia.week_id), None)
+        if trivia_entry_id is None:
+            return None
+    if award.claim_completion:
+        if not await claim_completion(db, award.user_id, award.lesson_id, award.xp):
+            return None
+    elif award.record_attempt:
+        outcome = await record_attempt(db, award.user_id, award.lesson_id, award.xp, award.completed)
+        xp = outcome.xp
+        if streak and not outcome.first_completion:
+            # Repeating a completed lesson does not grow the streak again
+            streak = None
+    if xp:
+        db.add(XPTransaction(
+            user_id=award.user_id,
+            source=award.source,
+            value=xp,
+            lesson_id=award.lesson_id,
+            trivia_entry_id=trivia_entry_id,
+        ))
+    if streak is not None:
+        await db.execute(
+            update(User).where(User.id == award.user_id).values(
+                streak_count=func.coalesce(User.streak_count, 0) + 1 if streak else 0
+            )
+        )
+    return xp
+
+
+# Core (not ORM) UPDATE so a list of parameters runs as a plain executemany
+_users = User.__table__
+_increment_xp = (
+    update(_users)
+    .where(_users.c.id == bindparam("uid"))
+    .values(xp=func.coalesce(_users.c.xp, 0) + bindparam("delta"))
+)
+
+
+async def _increment(db: AsyncSession, totals: Dict[int, int]) -> None:
+    # One executemany for every user touched; increments stay in SQL
+    rows = [{"uid": user_id, "delta": delta} for user_id, delta in totals.items() if delta]
+    if rows:
+        await db.execute(_increment_xp, rows)
+
+
+async def apply_awards(db: AsyncSession, awards: List[XPAward]) -> List[Optional[int]]:
+    """Apply awards in one transaction and commit once.
+
+    Returns the XP credited for each award, None where it was dropped.
+    """
+    results = []
+    totals: Dict[int, int] = defaultdict(int)
+    # Every trivia entry in the batch is claimed with a single insert
+    claimed = await claim_trivia_entries(db, [(award.user_id, award.trivia) for award in awards if award.trivia is not None])
+    for award in awards:
+        applied = await _apply(db, award, claimed)
+        if applied is not None:
+            totals[award.user_id] += applied
+        results.append(applied)
+    await _increment(db, totals)
+    # Users the live board does not know yet join it with their stored total and name
+    unknown = [user_id for user_id, delta in totals.items() if delta and user_id not in xp_leaderboard]
+    joined = (await db.execute(select(User.id, User.name, User.xp).where(User.id.in_(unknown)))).all() if unknown else []
+    await db.commit()
+    for user_id, name, xp in joined:
+        xp_leaderboard.set_score(user_id, xp or 0, name)
+    for user_id, delta in totals.items():
+        if user_id not in unknown:
+            xp_leaderboard.add_score(user_id, delta)
+    for award, applied in zip(awards, results):
+        if applied is not None and award.trivia is not None:
+            trivia_boards.record(award.user_id, award.trivia.week_id, award.trivia.score)
+    return results
+
+
+def _resolve(future: asyncio.Future, result: Optional[int]) -> None:
+    # The awaiting request may have been cancelled; its award is still written
+    if not future.done():
+        future.set_result(result)
+
+
+class XPWriter:
+    """Group-commit writer for XP awards.
+
+    Requests enqueue an award and await its own result. A single task drains
+    the queue, waiting up to ``window`` seconds (or until ``max_batch`` awards)
+    after the first arrival, and commits the whole batch in one transaction:
+    one writer-lock acquisition and one fsync instead of one per request.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, window: float, max_batch: int):
+        self._session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.awards = 0
+        self.fallbacks = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        # Sentinel: everything queued before it is still written
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, award: XPAward) -> Optional[int]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((award, future))
+        return await future
+
+    async def _collect(self) -> Tuple[List[Tuple[XPAward, asyncio.Future]], bool]:
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            try:
+                item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[XPAward, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.awards += len(batch)
+        try:
+            async with self._session_factory() as db:
+                results = await apply_awards(db, [award for award, _ in batch])
+        except Exception:
+            # One bad award must not fail its neighbours: retry each on its own
+            self.fallbacks += 1
+            for award, future in batch:
+                try:
+                    async with self._session_factory() as db:
+                        (result,) = await apply_awards(db, [award])
+                    _resolve(future, result)
+                except Exception as exc:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            _resolve(future, result)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "awards": self.awards,
+            "avg_batch": round(self.awards / self.batches, 2) if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+
+xp_writer = XPWriter(AsyncSessionLocal, settings.XP_WRITER_WINDOW_MS / 1000, settings.XP_WRITER_MAX_BATCH)
+
+
+# SQLite has one writer at a time and its busy handler polls rather than
+# queues, so in a burst of per-request commits some sessions starve past
+# busy_timeout. Direct awards in this process take turns on a lock instead,
+# and a commit that still finds the database locked (another process) is retried.
+_sqlite_writes = asyncio.Lock()
+BUSY_RETRIES = 3
+
+
+def _is_busy(exc: OperationalError) -> bool:
+    return "database is locked" in str(exc.orig)
+
+
+async def apply_award(db: AsyncSession, award: XPAward) -> Optional[int]:
+    """Commit one award on ``db`` in its own transaction; the path used when the writer is off."""
+    if db.get_bind().dialect.name != "sqlite":
+        (result,) = await apply_awards(db, [award])
+        return result
+    for attempt in range(BUSY_RETRIES + 1):
+        try:
+            async with _sqlite_writes:
+                (result,) = await apply_awards(db, [award])
+            return result
+        except OperationalError as exc:
+            await db.rollback()
+            if not _is_busy(exc) or attempt == BUSY_RETRIES:
+                raise
+            await asyncio.sleep(0.05 * 2 ** attempt)
+
+
+async def award_xp(db: AsyncSession, award: XPAward) -> Optional[int]:
+    """Route an award through the group-commit writer, or commit it on ``db`` when the writer is off.
+
+    Returns the XP credited, or None if the award was dropped.
+    """
+    if xp_writer.running:
+        return await xp_writer.submit(award)
+    return await apply_award(db, award)
@@ -1,13 +1,116 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from .config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Async drivers for the request path; seeding and scripts keep the sync engine
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+def _is_sqlite_memory(database: str) -> bool:
+    return not database or database == ":memory:" or database.startswith("file::memory:")
+
+# Named shared-cache in-memory database: every connection in the process,
+# sync or async, opens the same one instead of a private empty database
+SHARED_MEMORY_DATABASE = "file:harmony_quest?mode=memory&cache=shared&uri=true"
+
+def _engine_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and _is_sqlite_memory(parsed.database):
+        return f"{parsed.drivername}:///{SHARED_MEMORY_DATABASE}"
+    return url
+
+def engine_profile(url: str) -> Dict[str, Any]:
+    """Pool and connection settings for a database URL, chosen per backend."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return {
+            "name": "server",
+            "options": {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": True,
+            },
+            "pragmas": {},
+        }
+    if _is_sqlite_memory(parsed.database):
+        # One shared in-memory database (see _engine_url), held open by a
+        # single static connection per engine; no WAL, no pool tuning
+        return {
+            "name": "sqlite-memory",
+            "options": {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool},
+            "pragmas": {},
+        }
+    return {
+        "name": "sqlite-wal",
+        "options": {
+            "connect_args": {"check_same_thread": False},
+            "pool_size": settings.SQLITE_POOL_SIZE,
+            "max_overflow": settings.SQLITE_MAX_OVERFLOW,
+        },
+        # WAL lets readers proceed while a writer commits; NORMAL is durable
+        # across application crashes under WAL and skips an fsync per commit
+        "pragmas": {
+            "journal_mode": settings.SQLITE_JOURNAL_MODE,
+            "synchronous": settings.SQLITE_SYNCHRONOUS,
+            "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+            "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+            "mmap_size": settings.SQLITE_MMAP_SIZE,
+        },
+    }
+
+def _install_pragmas(sync_engine: Engine, pragmas: Dict[str, Any]) -> None:
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def build_engine(url: str) -> Engine:
+    profile = engine_profile(url)
+    engine = create_engine(_engine_url(url), **profile["options"])
+    _install_pragmas(engine, profile["pragmas"])
+    return engine
+
+def build_async_engine(url: str):
+    profile = engine_profile(url)
+    engine = create_async_engine(_engine_url(url), **profile["options"])
+    _install_pragmas(engine.sync_engine, profile["pragmas"])
+    return engine
+
+def dialect_insert(db, model):
+    """INSERT with ON CONFLICT support; SQLite and PostgreSQL share the same shape."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def describe_engines() -> str:
+    profile = engine_profile(settings.DATABASE_URL)
+    details = ", ".join(f"{key}={value}" for key, value in {**profile["options"], **profile["pragmas"]}.items() if key not in ("connect_args", "poolclass"))
+    return f"database profile: {profile['name']} ({engine.url.get_backend_name()}, async driver {async_engine.url.drivername}) {details}"
+
+engine = build_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = build_async_engine(settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL))
+# expire_on_commit=False so returned ORM objects stay readable after the commit
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -15,4 +118,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,15 +1,72 @@
 from fastapi import FastAPI
 from app.models import models  # Ensure models are imported
 from app.seed import seed
-from app.routes import lesson, user
+from app.routes import lesson, user, leaderboard, friends, trivia, encyclopedia, ai
+from app.database import SessionLocal, AsyncSessionLocal, async_engine, describe_engines
+from app.controllers.lesson_resolver import load_lesson_resolver
+from app.controllers.lesson_search import load_lesson_search
+from app.controllers.progress import backfill_lesson_progress
+from app.controllers.xp_writer import xp_writer
+from app.controllers.friends import load_friend_graph
+from app.controllers.trivia_schedule import prepare_trivia_weeks, run_trivia_scheduler
+from app.controllers.encyclopedia_cache import warm_encyclopedia
+from app.controllers.ai_cache import load_ai_cache
+from app.controllers.ai_log_writer import ai_log_writer
+from app.controllers.passwords import password_hasher
+from app.controllers.leaderboard import (
+    load_trivia_boards, load_xp_leaderboard, run_trivia_rollover, run_xp_snapshots, snapshot_weekly_xp,
+)
+from app.utils.weeks import iso_week_id
+from app.utils.log import configure_logging
+import asyncio
+from app.config import settings
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+import logging
 import os
 
+configure_logging(settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    logger.info(describe_engines())
     seed()
+    with SessionLocal() as db:
+        backfill_lesson_progress(db)
+    async with AsyncSessionLocal() as db:
+        await load_lesson_resolver(db)
+        await load_lesson_search(db)
+        await load_xp_leaderboard(db)
+        await load_trivia_boards(db)
+        await load_friend_graph(db)
+        # Schedule upcoming trivia weeks and compile this week's and next week's
+        await prepare_trivia_weeks(db, settings.TRIVIA_WEEKS_AHEAD, settings.TRIVIA_QUESTIONS_PER_WEEK)
+        await warm_encyclopedia(db)
+        await load_ai_cache(db)
+    if settings.XP_WRITER_ENABLED:
+        xp_writer.start()
+    ai_log_writer.start()
+    password_hasher.start()
+    background = [
+        asyncio.create_task(
+            run_xp_snapshots(AsyncSessionLocal, settings.LEADERBOARD_SNAPSHOT_SECONDS, settings.LEADERBOARD_SNAPSHOT_SIZE)
+        ),
+        asyncio.create_task(run_trivia_rollover(AsyncSessionLocal)),
+        asyncio.create_task(
+            run_trivia_scheduler(AsyncSessionLocal, settings.TRIVIA_WEEKS_AHEAD, settings.TRIVIA_QUESTIONS_PER_WEEK)
+        ),
+    ]
     yield
+    for task in background:
+        task.cancel()
+    password_hasher.stop()
+    # Drain queued XP awards and AI log rows before the engine goes away
+    await xp_writer.stop()
+    await ai_log_writer.stop()
+    async with AsyncSessionLocal() as db:
+        await snapshot_weekly_xp(db, iso_week_id(), settings.LEADERBOARD_SNAPSHOT_SIZE)
+    await async_engine.dispose()
 
 app = FastAPI(title="Harmony Quest API", lifespan=lifespan)
 
@@ -23,8 +80,13 @@ app.add_middleware(
 )
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to the Harmony Quest API!"}
 
 app.include_router(lesson.router)
-app.include_router(user.router)
\ No newline at end of file
+app.include_router(user.router)
+app.include_router(leaderboard.router)
+app.include_router(friends.router)
+app.include_router(trivia.router)
+app.include_router(encyclopedia.router)
+app.include_router(ai.router)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Boolean, Table, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Boolean, Table, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
@@ -46,6 +46,7 @@ class User(Base):
     friends = relationship("Friendship", back_populates="friend", foreign_keys='Friendship.friend_id')
     trivia_entries = relationship("TriviaEntry", back_populates="user")
     ai_logs = relationship("AIQuestionLog", back_populates="user")
+    lesson_progress = relationship("UserLessonProgress", back_populates="user")
 
 # Lesson
 class Lesson(Base):
@@ -60,6 +61,14 @@ class Lesson(Base):
     xp_reward = Column(Integer, default=10)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# LessonSlugAlias
+class LessonSlugAlias(Base):
+    """A slug a lesson was known by before it was renamed; old links keep resolving."""
+    __tablename__ = 'lesson_slug_aliases'
+    slug = Column(String, primary_key=True)
+    lesson_id = Column(Integer, ForeignKey('lessons.id'), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # XPTransaction
 class XPTransaction(Base):
     __tablename__ = 'xp_transactions'
@@ -73,6 +82,21 @@ class XPTransaction(Base):
 
     user = relationship("User", back_populates="xp_transactions")
 
+    # Weekly XP boards sum transactions by date range
+    __table_args__ = (Index('ix_xp_transactions_date', 'date'),)
+
+# UserLessonProgress
+class UserLessonProgress(Base):
+    __tablename__ = 'user_lesson_progress'
+    # Composite primary key doubles as the (user_id, lesson_id) lookup index
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    lesson_id = Column(Integer, ForeignKey('lessons.id'), primary_key=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    best_score = Column(Integer, default=0)  # Highest XP earned in a single attempt
+    attempts = Column(Integer, default=0)
+
+    user = relationship("User", back_populates="lesson_progress")
+
 # Friendship
 class Friendship(Base):
     __tablename__ = 'friendships'
@@ -107,8 +131,25 @@ class TriviaEntry(Base):
     score = Column(Integer, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Weekly boards are rebuilt per week_id
+        Index('ix_trivia_entries_week_user', 'week_id', 'user_id'),
+        # One entry per user per week; submissions insert-or-ignore against it
+        Index('ux_trivia_entries_user_week', 'user_id', 'week_id', unique=True),
+    )
+
     user = relationship("User", back_populates="trivia_entries")
 
+# TriviaQuestion
+class TriviaQuestion(Base):
+    __tablename__ = 'trivia_questions'
+    id = Column(Integer, primary_key=True, index=True)
+    theme = Column(String, nullable=False, index=True)
+    question = Column(Text, nullable=False)
+    options = Column(JSON, nullable=False)  # List of answer choices
+    answer = Column(String, nullable=False)  # The correct option
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # Leaderboard
 class Leaderboard(Base):
     __tablename__ = 'leaderboards'
@@ -118,6 +159,9 @@ class Leaderboard(Base):
     end_date = Column(DateTime(timezone=True), nullable=False)
     entries = relationship("LeaderboardEntry", back_populates="leaderboard")
 
+    # Weekly boards are looked up by (type, week start)
+    __table_args__ = (Index('ix_leaderboards_type_start', 'type', 'start_date'),)
+
 # LeaderboardEntry
 class LeaderboardEntry(Base):
     __tablename__ = 'leaderboard_entries'
@@ -126,6 +170,8 @@ class LeaderboardEntry(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     score = Column(Integer, default=0)
 
+    __table_args__ = (Index('ix_leaderboard_entries_board_score', 'leaderboard_id', 'score'),)
+
     leaderboard = relationship("Leaderboard", back_populates="entries")
     user = relationship("User")
 
@@ -153,4 +199,12 @@ class AIQuestionLog(Base):
     response = Column(Text, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
-    user = relationship("User", back_populates="ai_logs") 
\ No newline at end of file
+    user = relationship("User", back_populates="ai_logs")
+
+# SeedManifest
+class SeedManifest(Base):
+    """What seed() last wrote: one row per seeded item (e.g. "lesson:<slug>") with its content hash."""
+    __tablename__ = 'seed_manifest'
+    key = Column(String, primary_key=True)
+    digest = Column(String, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.controllers.ai_cache import ai_cache, answer_query
+from app.controllers.ai_log_writer import ai_log_writer, log_ai_question
+from app.routes.user import get_current_user_id
+from pydantic import BaseModel, Field
+from typing import Optional
+
+router = APIRouter(prefix="/ai", tags=["ai"])
+
+class AIQueryRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=2000)
+
+class AIQueryResponse(BaseModel):
+    answer: str
+    cached: bool = False
+    # "exact" or "near" for cache hits
+    match: Optional[str] = None
+    similarity: Optional[float] = None
+
+@router.post("/query", response_model=AIQueryResponse)
+async def ai_query(req: AIQueryRequest, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    answer, cached = await answer_query(req.query)
+    await log_ai_question(db, user_id, req.query, answer)
+    if cached is None:
+        return AIQueryResponse(answer=answer)
+    return AIQueryResponse(
+        answer=answer,
+        cached=True,
+        match=cached.match,
+        similarity=cached.similarity,
+    )
+
+@router.get("/cache/stats", response_model=dict)
+async def get_ai_cache_stats():
+    return ai_cache.stats()
+
+@router.get("/log/stats", response_model=dict)
+async def get_ai_log_stats():
+    return ai_log_writer.stats()
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.config import settings
+from app.models.models import EncyclopediaCategory
+from app.controllers import encyclopedia_search
+from app.controllers.encyclopedia_cache import load_entry_document, load_list_document
+from app.utils.http_cache import conditional_response
+from pydantic import BaseModel
+from typing import List, Optional
+
+router = APIRouter(prefix="/encyclopedia", tags=["encyclopedia"])
+
+# Entries change rarely; after max-age clients revalidate with If-None-Match
+CACHE_CONTROL = f"public, max-age={settings.ENCYCLOPEDIA_MAX_AGE}"
+
+class EncyclopediaSearchResult(BaseModel):
+    entry_id: int
+    category: EncyclopediaCategory
+    group_name: str
+    section: str
+    snippet: str
+    score: float
+
+@router.get("/search", response_model=List[EncyclopediaSearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[EncyclopediaCategory] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not encyclopedia_search.search_available:
+        raise HTTPException(status_code=501, detail="Search needs SQLite with FTS5")
+    match = encyclopedia_search.match_expression(q)
+    if not match:
+        raise HTTPException(status_code=400, detail="Query must contain at least one word")
+    return await encyclopedia_search.search_encyclopedia(db, match, category, limit, offset)
+
+@router.get("")
+async def list_entries(request: Request, category: Optional[EncyclopediaCategory] = None, db: AsyncSession = Depends(get_async_db)):
+    # Served from pre-encoded bytes; a matching If-None-Match never reaches the database
+    document = await load_list_document(db, category)
+    return conditional_response(request, document, CACHE_CONTROL)
+
+@router.get("/{entry_id}")
+async def get_entry(entry_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    document = await load_entry_document(db, entry_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return conditional_response(request, document, CACHE_CONTROL)
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.models import Friendship, FriendshipStatus, User
+from app.schemas.schemas import FriendshipResponse
+from app.controllers.friends import friend_graph
+from app.controllers.leaderboard import xp_leaderboard
+from app.routes.user import get_current_user_id
+from pydantic import BaseModel
+from typing import List, Optional
+
+router = APIRouter(prefix="/friends", tags=["friends"])
+
+class FriendRequest(BaseModel):
+    friend_id: int
+
+class FriendResponse(BaseModel):
+    user_id: int
+    name: Optional[str] = None
+    xp: Optional[int] = None
+
+class MutualFriendsResponse(BaseModel):
+    count: int
+    friends: List[FriendResponse]
+
+class SuggestionResponse(FriendResponse):
+    mutual_count: int
+
+def _friend(user_id: int, **extra) -> dict:
+    # Names and XP come from the live leaderboard, not the users table
+    return {"user_id": user_id, "name": xp_leaderboard.name(user_id), "xp": xp_leaderboard.score(user_id), **extra}
+
+def _between(user_id: int, other_id: int):
+    return or_(
+        and_(Friendship.user_id == user_id, Friendship.friend_id == other_id),
+        and_(Friendship.user_id == other_id, Friendship.friend_id == user_id),
+    )
+
+@router.get("", response_model=List[FriendResponse])
+async def list_friends(user_id: int = Depends(get_current_user_id)):
+    return [_friend(friend_id) for friend_id in friend_graph.friends(user_id)]
+
+@router.post("/requests", response_model=FriendshipResponse)
+async def send_friend_request(request: FriendRequest, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    if request.friend_id == user_id:
+        raise HTTPException(status_code=400, detail="Cannot befriend yourself")
+    if not await db.get(User, request.friend_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    existing = await db.scalar(select(Friendship).where(_between(user_id, request.friend_id)))
+    if existing:
+        if existing.status == FriendshipStatus.ACCEPTED:
+            raise HTTPException(status_code=400, detail="Already friends")
+        if existing.user_id == user_id:
+            raise HTTPException(status_code=400, detail="Friend request already sent")
+        # They already asked us: sending one back accepts it
+        existing.status = FriendshipStatus.ACCEPTED
+        await db.commit()
+        return existing
+    friendship = Friendship(user_id=user_id, friend_id=request.friend_id, status=FriendshipStatus.PENDING)
+    db.add(friendship)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Friend request already sent")
+    await db.refresh(friendship)
+    return friendship
+
+@router.get("/requests", response_model=List[FriendshipResponse])
+async def list_friend_requests(db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    return (await db.scalars(
+        select(Friendship).where(Friendship.friend_id == user_id, Friendship.status == FriendshipStatus.PENDING)
+    )).all()
+
+@router.post("/requests/{requester_id}/accept", response_model=FriendshipResponse)
+async def accept_friend_request(requester_id: int, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    friendship = await db.scalar(select(Friendship).where(
+        Friendship.user_id == requester_id,
+        Friendship.friend_id == user_id,
+        Friendship.status == FriendshipStatus.PENDING,
+    ))
+    if not friendship:
+        raise HTTPException(status_code=404, detail="Friend request not found")
+    # The commit hook adds the edge to friend_graph
+    friendship.status = FriendshipStatus.ACCEPTED
+    await db.commit()
+    return friendship
+
+@router.delete("/{friend_id}")
+async def remove_friend(friend_id: int, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    # Unfriends, or cancels / declines a pending request
+    friendship = await db.scalar(select(Friendship).where(_between(user_id, friend_id)))
+    if not friendship:
+        raise HTTPException(status_code=404, detail="Friendship not found")
+    await db.delete(friendship)
+    await db.commit()
+    return {"message": "Friendship removed"}
+
+@router.get("/suggestions", response_model=List[SuggestionResponse])
+async def get_friend_suggestions(limit: int = Query(10, ge=1, le=friend_graph.SUGGESTIONS_CACHED), user_id: int = Depends(get_current_user_id)):
+    return [_friend(candidate, mutual_count=count) for candidate, count in friend_graph.suggestions(user_id, limit)]
+
+@router.get("/{other_id}/mutual", response_model=MutualFriendsResponse)
+async def get_mutual_friends(other_id: int, user_id: int = Depends(get_current_user_id)):
+    mutual = friend_graph.mutual(user_id, other_id)
+    return MutualFriendsResponse(count=len(mutual), friends=[_friend(friend_id) for friend_id in mutual])
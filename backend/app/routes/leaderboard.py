@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.models import LeaderboardType
+from app.controllers.leaderboard import frozen_entries, trivia_boards, xp_leaderboard
+from app.routes.user import get_current_user_id
+from app.schemas.schemas import RankedEntryResponse
+from app.utils.weeks import iso_week_id
+from typing import List
+
+router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+
+class MyRankResponse(RankedEntryResponse):
+    total_users: int
+
+@router.get("/xp", response_model=List[RankedEntryResponse])
+async def get_xp_leaderboard(limit: int = Query(10, ge=1, le=100)):
+    return xp_leaderboard.top(limit)
+
+@router.get("/xp/me", response_model=MyRankResponse)
+async def get_my_xp_rank(user_id: int = Depends(get_current_user_id)):
+    rank = xp_leaderboard.rank(user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not ranked")
+    return MyRankResponse(
+        rank=rank,
+        user_id=user_id,
+        name=xp_leaderboard.name(user_id),
+        score=xp_leaderboard.score(user_id),
+        total_users=len(xp_leaderboard),
+    )
+
+@router.get("/xp/me/around", response_model=List[RankedEntryResponse])
+async def get_xp_around_me(radius: int = Query(5, ge=0, le=50), user_id: int = Depends(get_current_user_id)):
+    entries = xp_leaderboard.around(user_id, radius)
+    if not entries:
+        raise HTTPException(status_code=404, detail="User not ranked")
+    return entries
+
+async def _frozen_week(db: AsyncSession, board_type: LeaderboardType, week_id: str, limit: int):
+    try:
+        entries = await frozen_entries(db, board_type, week_id, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="week_id must look like 2024-W01")
+    if entries is None:
+        raise HTTPException(status_code=404, detail="No leaderboard for that week")
+    return entries
+
+@router.get("/xp/weeks/{week_id}", response_model=List[RankedEntryResponse])
+async def get_weekly_xp_leaderboard(week_id: str, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    return await _frozen_week(db, LeaderboardType.XP, week_id, limit)
+
+@router.get("/trivia", response_model=List[RankedEntryResponse])
+async def get_trivia_leaderboard(limit: int = Query(10, ge=1, le=100)):
+    board = trivia_boards.week(iso_week_id())
+    return board.top(limit) if board else []
+
+@router.get("/trivia/me", response_model=MyRankResponse)
+async def get_my_trivia_rank(user_id: int = Depends(get_current_user_id)):
+    board = trivia_boards.week(iso_week_id())
+    rank = board.rank(user_id) if board else None
+    if rank is None:
+        raise HTTPException(status_code=404, detail="No trivia entry this week")
+    return MyRankResponse(
+        rank=rank,
+        user_id=user_id,
+        name=board.name(user_id),
+        score=board.score(user_id),
+        total_users=len(board),
+    )
+
+@router.get("/trivia/weeks/{week_id}", response_model=List[RankedEntryResponse])
+async def get_weekly_trivia_leaderboard(week_id: str, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_async_db)):
+    # Open weeks are served live; closed ones from their frozen board
+    board = trivia_boards.week(week_id)
+    if board is not None:
+        return board.top(limit)
+    return await _frozen_week(db, LeaderboardType.TRIVIA, week_id, limit)
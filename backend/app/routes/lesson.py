@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.models import Lesson, User, XPTransaction
-from app.schemas.schemas import LessonResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from app.database import get_async_db
+from app.config import settings
+from app.models.models import Lesson, User
+from app.schemas.schemas import LessonResponse, LessonSummaryResponse
+from app.controllers.lesson_cache import lesson_cache, CATALOG_KEY, SUMMARY_KEY, slug_key, parts_key
+from app.controllers.lesson_parts import build_part_index
+from app.controllers.grading import grader_registry
+from app.controllers.lesson_search import lesson_search, load_lesson_search
+from app.controllers.xp_writer import XPAward, award_xp
 from pydantic import BaseModel
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+import json
 import re
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
@@ -12,61 +21,189 @@ router = APIRouter(prefix="/lessons", tags=["lessons"])
 def slugify(title):
     return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
 
+def _lesson_payload(lesson: Lesson, schema=LessonResponse):
+    if settings.PRESERIALIZE_LESSONS:
+        # Encode once; cached bytes are sent as-is on every later request
+        return schema.from_orm(lesson).model_dump_json().encode()
+    return schema.from_orm(lesson).dict()
+
+def _encode(data: Any):
+    if settings.PRESERIALIZE_LESSONS:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    return data
+
+def _catalog_payload(payloads: List[Any]):
+    if settings.PRESERIALIZE_LESSONS:
+        return b"[" + b",".join(payloads) + b"]"
+    return payloads
+
+def _respond(payload: Any):
+    if isinstance(payload, bytes):
+        return Response(content=payload, media_type="application/json")
+    return payload
+
 class LessonCompleteRequest(BaseModel):
     user_id: int
     answers: Dict[str, Any]
 
+class PartScoreResponse(BaseModel):
+    part: Optional[str]
+    correct: int
+    total: int
+
 class LessonCompleteResponse(BaseModel):
     correct: bool
     xp_awarded: int
     new_streak: int
     total_xp: int
     feedback: str
+    score: int = 0
+    max_score: int = 0
+    parts: List[PartScoreResponse] = []
+
+async def _get_grader(lesson_id: int, db: AsyncSession):
+    if not grader_registry.loaded:
+        # One read compiles every lesson; later submissions never touch the lessons table
+        generation = grader_registry.generation
+        rows = (await db.execute(select(Lesson.id, Lesson.answer_key, Lesson.xp_reward))).all()
+        # Answer from these rows even if an invalidation meanwhile kept them out of the registry
+        return grader_registry.load(rows, generation).get(lesson_id)
+    return grader_registry.get(lesson_id)
 
 @router.post("/{lesson_id}/complete", response_model=LessonCompleteResponse)
-def complete_lesson(lesson_id: int, req: LessonCompleteRequest, db: Session = Depends(get_db)):
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-    if not lesson:
+async def complete_lesson(lesson_id: int, req: LessonCompleteRequest, db: AsyncSession = Depends(get_async_db)):
+    grader = await _get_grader(lesson_id, db)
+    if not grader:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    user = db.query(User).filter(User.id == req.user_id).first()
+    user = await db.get(User, req.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Simple answer check (assumes answer_key and answers are dicts with same keys)
-    correct = lesson.answer_key == req.answers
-    xp_awarded = lesson.xp_reward if correct else 0
+    result = grader.grade(req.answers)
+    correct = result.correct
+    xp_awarded = 0
 
-    # Update XP and streak if correct
-    feedback = "Correct!" if correct else "Incorrect. Try again!"
-    if correct:
-        user.xp += xp_awarded
-        user.streak_count += 1
-        db.add(XPTransaction(user_id=user.id, source="lesson", value=xp_awarded, lesson_id=lesson.id))
+    # Partial XP for partially correct submissions; the streak only grows on a perfect score
+    if not result.max_score:
+        feedback = "This lesson has no graded questions."
+    elif correct:
+        feedback = "Correct!"
+    elif result.score:
+        feedback = f"You got {result.score} of {result.max_score} correct. Try again!"
     else:
-        user.streak_count = 0
-    db.commit()
-    db.refresh(user)
+        feedback = "Incorrect. Try again!"
+    if result.max_score:
+        # XP and streak change in SQL so concurrent submissions never lose updates.
+        # Only the improvement on the user's best attempt is credited.
+        xp_awarded = await award_xp(db, XPAward(
+            user_id=user.id,
+            xp=result.xp_awarded,
+            lesson_id=lesson_id,
+            record_attempt=True,
+            completed=correct,
+            streak=correct,
+        )) or 0
+    await db.refresh(user)
     return LessonCompleteResponse(
         correct=correct,
         xp_awarded=xp_awarded,
         new_streak=user.streak_count,
         total_xp=user.xp,
-        feedback=feedback
+        feedback=feedback,
+        score=result.score,
+        max_score=result.max_score,
+        parts=[PartScoreResponse(part=part.part, correct=part.correct, total=part.total) for part in result.parts],
     )
 
+@router.get("/cache/stats", response_model=dict)
+async def get_lesson_cache_stats():
+    return lesson_cache.stats()
+
+@router.get("/summary", response_model=List[LessonSummaryResponse])
+async def get_lesson_summaries(db: AsyncSession = Depends(get_async_db)):
+    cached = lesson_cache.get(SUMMARY_KEY)
+    if cached is not None:
+        return _respond(cached)
+    generation = lesson_cache.generation
+    # Deferred columns: the content/answer_key JSON is never selected or parsed
+    lessons = (await db.scalars(select(Lesson).options(
+        load_only(Lesson.id, Lesson.title, Lesson.slug, Lesson.topic, Lesson.type, Lesson.xp_reward)
+    ))).all()
+    summaries = _catalog_payload([_lesson_payload(lesson, LessonSummaryResponse) for lesson in lessons])
+    lesson_cache.set(SUMMARY_KEY, summaries, generation)
+    return _respond(summaries)
+
+class LessonSearchHit(BaseModel):
+    slug: str
+    title: str
+    part: int
+    question: int
+    question_text: str
+    score: float
+
+@router.get("/search", response_model=List[LessonSearchHit])
+async def search_lessons(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Questions whose wording, answers or explanation match `q`; a trailing * matches a prefix."""
+    return (await load_lesson_search(db)).search(q, limit)
+
 @router.get("/slug/{slug}", response_model=dict)
-def get_lesson_by_slug(slug: str, db: Session = Depends(get_db)):
-    lesson = db.query(Lesson).filter(Lesson.slug == slug).first()
+async def get_lesson_by_slug(slug: str, db: AsyncSession = Depends(get_async_db)):
+    cached = lesson_cache.get(slug_key(slug))
+    if cached is not None:
+        return _respond(cached)
+    generation = lesson_cache.generation
+    lesson = await db.scalar(select(Lesson).where(Lesson.slug == slug))
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    lesson_data = _lesson_payload(lesson)
+    lesson_cache.set(slug_key(slug), lesson_data, generation)
+    return _respond(lesson_data)
+
+async def _get_part_index(slug: str, db: AsyncSession):
+    index = lesson_cache.get(parts_key(slug))
+    if index is not None:
+        return index
+    generation = lesson_cache.generation
+    lesson = await db.scalar(select(Lesson).where(Lesson.slug == slug))
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    return LessonResponse.from_orm(lesson).dict()
+    index = build_part_index(lesson, _encode)
+    lesson_cache.set(parts_key(slug), index, generation)
+    return index
+
+@router.get("/slug/{slug}/parts", response_model=dict)
+async def get_lesson_parts_manifest(slug: str, db: AsyncSession = Depends(get_async_db)):
+    return _respond((await _get_part_index(slug, db)).manifest)
+
+@router.get("/slug/{slug}/parts/{n}", response_model=dict)
+async def get_lesson_part(slug: str, n: int, db: AsyncSession = Depends(get_async_db)):
+    part = (await _get_part_index(slug, db)).part(n)
+    if part is None:
+        raise HTTPException(status_code=404, detail="Lesson part not found")
+    return _respond(part)
 
 @router.get("/", response_model=List[dict])
-def get_lessons(db: Session = Depends(get_db)):
-    lessons = db.query(Lesson).all()
+async def get_lessons(db: AsyncSession = Depends(get_async_db)):
+    cached = lesson_cache.get(CATALOG_KEY)
+    if cached is not None:
+        return _respond(cached)
+    generation = lesson_cache.generation
+    search_generation = lesson_search.generation
+    lessons = (await db.scalars(select(Lesson))).all()
     result = []
     for lesson in lessons:
-        lesson_data = LessonResponse.from_orm(lesson).dict()
+        lesson_data = _lesson_payload(lesson)
         # The slug is already in the database, no need to generate it
         result.append(lesson_data)
-    return result 
\ No newline at end of file
+        # Warm the per-slug entries from the same read
+        lesson_cache.set(slug_key(lesson.slug), lesson_data, generation)
+    if not lesson_search.loaded:
+        # Build the question index from the same rows
+        lesson_search.load([(lesson.slug, lesson.title, lesson.content) for lesson in lessons], search_generation)
+    catalog = _catalog_payload(result)
+    lesson_cache.set(CATALOG_KEY, catalog, generation)
+    return _respond(catalog)
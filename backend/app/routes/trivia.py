@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.config import settings
+from app.models.models import TriviaEntry
+from app.controllers.trivia import TriviaSubmission, trivia_registry
+from app.controllers.xp_writer import XPAward, award_xp
+from app.routes.user import get_current_user_id
+from app.utils.weeks import iso_week_id
+from pydantic import BaseModel
+from typing import Any, List
+
+router = APIRouter(prefix="/trivia", tags=["trivia"])
+
+class TriviaSubmitRequest(BaseModel):
+    answers: List[Any]
+
+class TriviaSubmitResponse(BaseModel):
+    week_id: str
+    score: int
+    max_score: int
+    xp_awarded: int
+    already_submitted: bool = False
+
+@router.get("/current")
+async def get_current_trivia(db: AsyncSession = Depends(get_async_db)):
+    challenge = await trivia_registry.load(db, iso_week_id())
+    if not challenge:
+        raise HTTPException(status_code=404, detail="No trivia challenge this week")
+    # Questions only; the answer key never leaves the server
+    return Response(content=challenge.payload, media_type="application/json")
+
+@router.post("/{week_id}/submit", response_model=TriviaSubmitResponse)
+async def submit_trivia(week_id: str, submission: TriviaSubmitRequest, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    if week_id != iso_week_id():
+        raise HTTPException(status_code=400, detail="Trivia for that week is not open")
+    challenge = await trivia_registry.load(db, week_id)
+    if not challenge:
+        raise HTTPException(status_code=404, detail="No trivia challenge this week")
+    score = challenge.grade(submission.answers)
+    xp = score * settings.TRIVIA_XP_PER_CORRECT
+    # The entry, its XP and the leaderboard update go through the group-commit writer
+    accepted = await award_xp(db, XPAward(
+        user_id=user_id,
+        xp=xp,
+        source="trivia",
+        trivia=TriviaSubmission(week_id, submission.answers, score),
+    ))
+    if accepted is None:
+        # One entry per user per week: report the score that was kept
+        kept = await db.scalar(select(TriviaEntry.score).where(TriviaEntry.user_id == user_id, TriviaEntry.week_id == week_id))
+        return TriviaSubmitResponse(week_id=week_id, score=kept or 0, max_score=challenge.max_score, xp_awarded=0, already_submitted=True)
+    return TriviaSubmitResponse(week_id=week_id, score=score, max_score=challenge.max_score, xp_awarded=xp)
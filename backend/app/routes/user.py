@@ -1,18 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.models import User, Lesson, XPTransaction
-from app.schemas.schemas import UserCreate, UserResponse
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.models import User, UserLessonProgress
+from app.schemas.schemas import RankedEntryResponse, UserCreate, UserResponse
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from app.config import settings
+from app.controllers.lesson_resolver import load_lesson_resolver
+from app.controllers.xp_writer import XPAward, award_xp
+from app.controllers.leaderboard import xp_leaderboard
+from app.controllers.friends import friend_graph
+from app.controllers.auth import verify_token
+from app.controllers.passwords import LEGACY_OAUTH_PASSWORD, NO_PASSWORD, PasswordPoolBusy, password_hasher
 from pydantic import BaseModel
 from typing import List, Optional
-import re
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/users", tags=["users"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -24,26 +30,29 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user_id(authorization: str = Header(None), db: Session = Depends(get_db)) -> int:
+async def get_current_user_id(authorization: str = Header(None)) -> int:
     if not authorization or not authorization.startswith("Bearer "):
-        print("WARNING: No authorization header provided, using user_id=1 for development")
+        logger.warning("No authorization header provided, using user_id=1 for development")
         return 1
-    
     try:
-        token = authorization.split(" ")[1]
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
-        print(f"Successfully authenticated user_id: {user_id}")
-        return user_id
-    except (JWTError, ValueError, IndexError) as e:
-        print(f"WARNING: Invalid token, using user_id=1 for development. Error: {e}")
+        # Verified tokens are cached until they expire; repeats skip jwt.decode
+        return verify_token(authorization.split(" ")[1])
+    except (JWTError, ValueError, TypeError, IndexError) as e:
+        logger.warning("Invalid token, using user_id=1 for development", extra={"error": str(e)})
         return 1
 
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Too many sign-ins in progress, try again shortly", headers={"Retry-After": "1"})
+
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if await db.scalar(select(User).where(User.email == user.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = pwd_context.hash(user.password)
+    # bcrypt is CPU-bound; it runs in the password process pool
+    try:
+        hashed_pw = await password_hasher.hash(user.password)
+    except PasswordPoolBusy:
+        raise _busy()
     db_user = User(
         name=user.name,
         email=user.email,
@@ -53,8 +62,9 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         privacy_settings=user.privacy_settings
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    xp_leaderboard.set_score(db_user.id, db_user.xp or 0, db_user.name)
     return db_user
 
 class LoginRequest(UserCreate):
@@ -66,16 +76,27 @@ class LoginResponse(BaseModel):
     user: UserResponse
 
 @router.post("/login", response_model=LoginResponse)
-def login(login: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == login.email).first()
-    if not user or not pwd_context.verify(login.password, user.password_hash):
+async def login(login: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == login.email))
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        verified = await password_hasher.verify(login.password, user.password_hash)
+    except PasswordPoolBusy:
+        raise _busy()
+    if not verified:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if login.password == LEGACY_OAUTH_PASSWORD:
+        # An OAuth account created before NO_PASSWORD: retire its placeholder hash on first use
+        user.password_hash = NO_PASSWORD
+        await db.commit()
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token({"sub": str(user.id)})
     return LoginResponse(access_token=token, user=user)
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_current_user(db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -94,31 +115,28 @@ class LessonProgressResponse(BaseModel):
     slug: str
     completed: bool
 
-def slugify(title):
-    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
-
 class OAuthUpsertRequest(BaseModel):
     email: str
     name: Optional[str] = None
     avatar: Optional[str] = None
 
 @router.post("/oauth_upsert", response_model=LoginResponse)
-def oauth_upsert(payload: OAuthUpsertRequest, db: Session = Depends(get_db)):
+async def oauth_upsert(payload: OAuthUpsertRequest, db: AsyncSession = Depends(get_async_db)):
     # Find existing user by email
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = await db.scalar(select(User).where(User.email == payload.email))
     if not user:
-        # Create a user with random password hash placeholder (not used)
+        # OAuth-only account: no password can log into it
         user = User(
             name=payload.name or payload.email.split('@')[0],
             email=payload.email,
-            password_hash=pwd_context.hash("oauth_placeholder"),
+            password_hash=NO_PASSWORD,
             avatar=payload.avatar,
             light_dark_mode="light",
             privacy_settings={},
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     else:
         # Update profile fields if changed
         updated = False
@@ -129,15 +147,16 @@ def oauth_upsert(payload: OAuthUpsertRequest, db: Session = Depends(get_db)):
             user.avatar = payload.avatar
             updated = True
         if updated:
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+    xp_leaderboard.set_score(user.id, user.xp or 0, user.name)
 
     token = create_access_token({"sub": str(user.id)})
     return LoginResponse(access_token=token, user=user)
 
 @router.put("/me", response_model=UserResponse)
-def update_user_progress(update_data: UserUpdateRequest, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def update_user_progress(update_data: UserUpdateRequest, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -146,90 +165,56 @@ def update_user_progress(update_data: UserUpdateRequest, db: Session = Depends(g
     if update_data.streak_count is not None:
         user.streak_count = update_data.streak_count
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    xp_leaderboard.set_score(user.id, user.xp or 0, user.name)
     return user
 
 @router.post("/me/lessons/complete")
-def complete_lesson(lesson_data: LessonCompleteRequest, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
-    # Find lesson by slug
-    lesson = db.query(Lesson).filter(Lesson.title.ilike(f"%{lesson_data.lesson_slug.replace('-', ' ')}%")).first()
-    if not lesson:
+async def complete_lesson(lesson_data: LessonCompleteRequest, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    # Resolve slug, title or historical slug to a lesson id in memory
+    lesson_id = (await load_lesson_resolver(db)).resolve(lesson_data.lesson_slug)
+    if lesson_id is None:
         raise HTTPException(status_code=404, detail="Lesson not found")
     
-    # Check if lesson already completed
-    existing_transaction = db.query(XPTransaction).filter(
-        XPTransaction.user_id == user_id,
-        XPTransaction.lesson_id == lesson.id
-    ).first()
-    
-    if existing_transaction:
-        return {"message": "Lesson already completed", "lesson_id": lesson.id}
+    # Claim the completion, log the XP and increment the user's total in one
+    # (group-committed) transaction; duplicate or concurrent requests find it
+    # already claimed
+    if await award_xp(db, XPAward(user_id=user_id, xp=lesson_data.xp_earned, lesson_id=lesson_id, claim_completion=True)) is None:
+        return {"message": "Lesson already completed", "lesson_id": lesson_id}
     
-    # Create XP transaction for lesson completion
-    xp_transaction = XPTransaction(
-        user_id=user_id,
-        lesson_id=lesson.id,
-        source="lesson",
-        value=lesson_data.xp_earned
-    )
-    db.add(xp_transaction)
-    
-    # Update user's total XP
-    user = db.query(User).filter(User.id == user_id).first()
-    if user:
-        user.xp = (user.xp or 0) + lesson_data.xp_earned
-    
-    db.commit()
-    return {"message": "Lesson completed successfully", "lesson_id": lesson.id, "xp_earned": lesson_data.xp_earned}
+    return {"message": "Lesson completed successfully", "lesson_id": lesson_id, "xp_earned": lesson_data.xp_earned}
 
 @router.post("/me/lessons/{lesson_slug}/complete")
-def complete_lesson_by_slug(lesson_slug: str, xp_data: dict, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
-    # Find lesson by slug
-    lesson = db.query(Lesson).filter(Lesson.slug == lesson_slug).first()
-    if not lesson:
-        # Fallback: try to find by title pattern
-        lesson = db.query(Lesson).filter(Lesson.title.ilike(f"%{lesson_slug.replace('-', ' ')}%")).first()
-    
-    if not lesson:
+async def complete_lesson_by_slug(lesson_slug: str, xp_data: dict, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    # Resolve slug, title or historical slug to a lesson id in memory
+    lesson_id = (await load_lesson_resolver(db)).resolve(lesson_slug)
+    if lesson_id is None:
         raise HTTPException(status_code=404, detail="Lesson not found")
     
-    # Check if lesson already completed
-    existing_transaction = db.query(XPTransaction).filter(
-        XPTransaction.user_id == user_id,
-        XPTransaction.lesson_id == lesson.id
-    ).first()
-    
-    if existing_transaction:
-        return {"message": "Lesson already completed", "lesson_id": lesson.id}
-    
     # Get XP earned from request body
     xp_earned = xp_data.get("xpEarned", 0)
     
-    # Create XP transaction for lesson completion
-    xp_transaction = XPTransaction(
-        user_id=user_id,
-        lesson_id=lesson.id,
-        source="lesson",
-        value=xp_earned
-    )
-    db.add(xp_transaction)
-    
-    # Update user's total XP
-    user = db.query(User).filter(User.id == user_id).first()
-    if user:
-        user.xp = (user.xp or 0) + xp_earned
+    # Claim the completion, log the XP and increment the user's total in one
+    # (group-committed) transaction; duplicate or concurrent requests find it
+    # already claimed
+    if await award_xp(db, XPAward(user_id=user_id, xp=xp_earned, lesson_id=lesson_id, claim_completion=True)) is None:
+        return {"message": "Lesson already completed", "lesson_id": lesson_id}
     
-    db.commit()
-    return {"message": "Lesson completed successfully", "lesson_id": lesson.id, "xp_earned": xp_earned}
+    return {"message": "Lesson completed successfully", "lesson_id": lesson_id, "xp_earned": xp_earned}
 
 @router.get("/me/lessons", response_model=List[LessonProgressResponse])
-def get_user_lessons(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
-    lessons = db.query(Lesson).all()
+async def get_user_lessons(db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    lessons = (await load_lesson_resolver(db)).lessons
     completed_lesson_ids = set(
-        row.lesson_id for row in db.query(XPTransaction.lesson_id).filter(
-            XPTransaction.user_id == user_id,
-            XPTransaction.lesson_id != None
-        ).all()
+        await db.scalars(select(UserLessonProgress.lesson_id).where(
+            UserLessonProgress.user_id == user_id,
+            UserLessonProgress.completed_at != None
+        ))
     )
-    return [LessonProgressResponse(id=lesson.id, title=lesson.title, slug=slugify(lesson.title), completed=lesson.id in completed_lesson_ids) for lesson in lessons] 
\ No newline at end of file
+    return [LessonProgressResponse(id=lesson.id, title=lesson.title, slug=lesson.title_slug, completed=lesson.id in completed_lesson_ids) for lesson in lessons] 
+
+@router.get("/me/leaderboard/friends", response_model=List[RankedEntryResponse])
+async def get_friends_leaderboard(user_id: int = Depends(get_current_user_id)):
+    # Friend ids from the adjacency index, XP from the live board: no query
+    return xp_leaderboard.rank_among([user_id, *friend_graph.friends(user_id)])
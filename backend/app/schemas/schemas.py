@@ -63,6 +63,17 @@ class LessonResponse(LessonBase):
     class Config:
         from_attributes = True
 
+class LessonSummaryResponse(BaseModel):
+    # List view fields only; content and answer_key are never loaded
+    id: int
+    title: str
+    slug: str
+    topic: str
+    type: LessonType
+    xp_reward: int
+    class Config:
+        from_attributes = True
+
 # XPTransaction
 class XPTransactionBase(BaseModel):
     source: str
@@ -156,6 +167,10 @@ class LeaderboardEntryResponse(LeaderboardEntryBase):
     class Config:
         from_attributes = True
 
+class RankedEntryResponse(LeaderboardEntryBase):
+    rank: int
+    name: Optional[str] = None
+
 # EncyclopediaEntry
 class EncyclopediaEntryBase(BaseModel):
     category: EncyclopediaCategory
@@ -177,6 +192,15 @@ class EncyclopediaEntryResponse(EncyclopediaEntryBase):
     class Config:
         from_attributes = True
 
+class EncyclopediaEntrySummary(BaseModel):
+    # Library list view; the section texts are only in the detail response
+    id: int
+    category: EncyclopediaCategory
+    group_name: str
+    media: Optional[List[Any]] = []
+    class Config:
+        from_attributes = True
+
 # AIQuestionLog
 class AIQuestionLogBase(BaseModel):
     query: str
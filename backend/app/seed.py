@@ -1,11 +1,20 @@
-from app.database import engine
-from app.models.models import Base, User, Lesson, TriviaChallenge, LessonType
+from app.database import engine, dialect_insert
+from app.controllers.encyclopedia_search import install_encyclopedia_search
+from app.controllers.lesson_cache import invalidate_lessons
+from app.controllers.passwords import pwd_context
+from app.models.models import Base, User, Lesson, LessonSlugAlias, TriviaQuestion, LessonType, SeedManifest
+from sqlalchemy import case, delete, func, insert, or_, select, update
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from typing import Dict, Any
+from typing import Dict, Any, List
+import hashlib
+import json
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Bump when how seed data is written changes (not the data itself, which is
+# hashed): every item is then rewritten on the next boot
+SEED_VERSION = "2"
+VERSION_KEY = "version"
+TEST_USER_KEY = "user:test@example.com"
+TRIVIA_KEY = "trivia_questions"
 
 
 def _generate_answer_key(content: Dict[str, Any]) -> Dict[str, Any]:
@@ -54,12 +63,159 @@ def _coerce_lesson_type(t: Any) -> LessonType:
     return LessonType.MCQ
 
 
+def _create_missing_indexes():
+    # create_all() skips tables that already exist, so indexes added to
+    # existing models later have to be created separately
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+# Question bank for the weekly trivia challenge: theme -> (question, options, answer)
+TRIVIA_QUESTIONS = {
+    "Festivals of Faith": [
+        ("Which Hindu festival is known as the Festival of Lights?", ["Thaipusam", "Deepavali", "Pongal", "Holi"], "Deepavali"),
+        ("Hari Raya Puasa marks the end of which month of fasting?", ["Muharram", "Rajab", "Ramadan", "Shawwal"], "Ramadan"),
+        ("Vesak Day commemorates the birth, enlightenment and passing of whom?", ["The Buddha", "Confucius", "Laozi", "Guru Nanak"], "The Buddha"),
+        ("Which festival is celebrated with mooncakes and lanterns?", ["Qingming Festival", "Dragon Boat Festival", "Mid-Autumn Festival", "Lantern Festival"], "Mid-Autumn Festival"),
+        ("Thaipusam is celebrated in honour of which deity?", ["Lord Ganesha", "Lord Murugan", "Lord Shiva", "Lord Vishnu"], "Lord Murugan"),
+        ("What do Christians celebrate at Easter?", ["The birth of Jesus", "The resurrection of Jesus", "The baptism of Jesus", "The Last Supper"], "The resurrection of Jesus"),
+        ("Vaisakhi is an important festival in which religion?", ["Jainism", "Hinduism", "Sikhism", "Buddhism"], "Sikhism"),
+        ("For how many nights is Hanukkah celebrated?", ["Three", "Seven", "Eight", "Ten"], "Eight"),
+        ("Hari Raya Haji coincides with the end of which pilgrimage?", ["Umrah", "Hajj", "Kumbh Mela", "Camino"], "Hajj"),
+        ("Naw-Ruz is the new year festival of which faith?", ["Taoism", "Jainism", "Sikhism", "Baha'i Faith"], "Baha'i Faith"),
+    ],
+    "Core Tenets & Beliefs": [
+        ("How many Pillars of Islam are there?", ["Three", "Five", "Seven", "Ten"], "Five"),
+        ("The Four Noble Truths are a core teaching of which religion?", ["Buddhism", "Taoism", "Hinduism", "Jainism"], "Buddhism"),
+        ("What is the holy scripture of Sikhism?", ["The Vedas", "The Tripitaka", "The Guru Granth Sahib", "The Avesta"], "The Guru Granth Sahib"),
+        ("Ahimsa, the principle of non-violence, is central to which religion?", ["Christianity", "Jainism", "Judaism", "Taoism"], "Jainism"),
+        ("Which text is the foundational scripture of Taoism?", ["The Analects", "The Tao Te Ching", "The Bhagavad Gita", "The Dhammapada"], "The Tao Te Ching"),
+        ("The Torah is the central text of which religion?", ["Judaism", "Islam", "Christianity", "Baha'i Faith"], "Judaism"),
+        ("In Hinduism, what is the cycle of birth, death and rebirth called?", ["Dharma", "Moksha", "Samsara", "Karma"], "Samsara"),
+        ("Who founded Sikhism?", ["Guru Gobind Singh", "Guru Nanak", "Guru Arjan", "Guru Tegh Bahadur"], "Guru Nanak"),
+        ("Which religion was founded by Baha'u'llah?", ["Baha'i Faith", "Jainism", "Sikhism", "Zoroastrianism"], "Baha'i Faith"),
+        ("Christians believe in the Trinity: the Father, the Son and the...?", ["Holy Prophet", "Holy Spirit", "Holy Land", "Holy Book"], "Holy Spirit"),
+    ],
+    "Sacred Places": [
+        ("Which city is home to Islam's holiest site, the Kaaba?", ["Medina", "Jerusalem", "Mecca", "Cairo"], "Mecca"),
+        ("The Golden Temple (Harmandir Sahib) is in which city?", ["Amritsar", "Delhi", "Varanasi", "Lahore"], "Amritsar"),
+        ("Where did the Buddha attain enlightenment?", ["Lumbini", "Bodh Gaya", "Sarnath", "Kushinagar"], "Bodh Gaya"),
+        ("The Western Wall stands in which city?", ["Jerusalem", "Tel Aviv", "Amman", "Damascus"], "Jerusalem"),
+        ("Sri Mariamman Temple, Singapore's oldest Hindu temple, is in which district?", ["Little India", "Chinatown", "Kampong Glam", "Geylang"], "Chinatown"),
+        ("Masjid Sultan is a landmark of which Singapore neighbourhood?", ["Kampong Glam", "Tiong Bahru", "Katong", "Bugis Junction"], "Kampong Glam"),
+        ("The holy city of Varanasi lies on the banks of which river?", ["Indus", "Brahmaputra", "Ganges", "Yamuna"], "Ganges"),
+        ("Vatican City is the seat of which church?", ["The Anglican Church", "The Roman Catholic Church", "The Orthodox Church", "The Methodist Church"], "The Roman Catholic Church"),
+        ("Thian Hock Keng temple in Singapore is dedicated mainly to which sea goddess?", ["Guanyin", "Mazu", "Chang'e", "Nuwa"], "Mazu"),
+        ("Which is the oldest church building in Singapore?", ["St Andrew's Cathedral", "Cathedral of the Good Shepherd", "Armenian Church", "CHIJMES Hall"], "Armenian Church"),
+    ],
+    "Daily Practices": [
+        ("How many times a day do Muslims perform the obligatory prayers?", ["Three", "Four", "Five", "Seven"], "Five"),
+        ("In Sikhism, what is a langar?", ["A prayer bead", "A free community kitchen", "A holy river", "A wedding song"], "A free community kitchen"),
+        ("Which meat do practising Muslims avoid?", ["Pork", "Chicken", "Lamb", "Beef"], "Pork"),
+        ("Many Hindus avoid eating which meat?", ["Fish", "Chicken", "Beef", "Mutton"], "Beef"),
+        ("What is the Jewish weekly day of rest called?", ["Shabbat", "Sukkot", "Purim", "Pesach"], "Shabbat"),
+        ("During Ramadan, Muslims fast during which hours?", ["From dawn to sunset", "From noon to midnight", "Only in the morning", "For the whole day and night"], "From dawn to sunset"),
+        ("Food prepared according to Jewish dietary law is called?", ["Halal", "Kosher", "Sattvic", "Vegan"], "Kosher"),
+        ("What do many Chinese families burn as offerings during the Hungry Ghost Festival?", ["Incense sticks only", "Joss paper", "Candles", "Rice cakes"], "Joss paper"),
+        ("Many Sikh men wear which head covering?", ["A kippah", "A turban", "A songkok", "A topi"], "A turban"),
+        ("Which of these do many Jains avoid eating?", ["Rice", "Onions and potatoes", "Wheat bread", "Apples"], "Onions and potatoes"),
+        ("Curry debal (devil's curry) is a signature dish of which community?", ["Peranakan", "Eurasian", "Malay", "Tamil"], "Eurasian"),
+    ],
+    "Respectful Interactions": [
+        ("What should you usually do before entering a mosque, Hindu temple or gurdwara?", ["Remove your shoes", "Remove your watch", "Ring a bell", "Wash your hair"], "Remove your shoes"),
+        ("When visiting a gurdwara, what should visitors cover?", ["Their hands", "Their head", "Their feet", "Their mouth"], "Their head"),
+        ("In Malay and Indian customs, which hand is traditionally used to give and receive items?", ["The left hand", "The right hand", "Either hand", "Neither; place items on a table"], "The right hand"),
+        ("What is a respectful way to greet a Malay elder?", ["A light handshake, then touching your hand to your chest", "A firm hug", "A high five", "A kiss on both cheeks"], "A light handshake, then touching your hand to your chest"),
+        ("What colour envelope is used for an ang bao at Chinese New Year?", ["White", "Black", "Red", "Blue"], "Red"),
+        ("Which gift is traditionally avoided for Chinese hosts because it is associated with death?", ["A clock", "Oranges", "Tea", "A fruit basket"], "A clock"),
+        ("In Malay culture, what is considered a polite way to point?", ["With the index finger", "With the thumb", "With the chin", "With the foot"], "With the thumb"),
+        ("Which items are often not allowed inside Hindu temples?", ["Flowers", "Leather items", "Fruit", "Coconuts"], "Leather items"),
+        ("During Ramadan, what is a considerate thing to do around fasting colleagues?", ["Avoid eating or drinking in front of them", "Offer them snacks at lunch", "Schedule lunch meetings", "Ask them to eat with you"], "Avoid eating or drinking in front of them"),
+        ("What is a polite way to pass an item to an elder in many Asian cultures?", ["Toss it to them", "Use both hands", "Slide it across the table", "Use only your left hand"], "Use both hands"),
+    ],
+}
+
+
+def _digest(data: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+    ).hexdigest()
+
+
+def _lesson_row(lesson: Dict[str, Any]) -> Dict[str, Any]:
+    content = lesson.get("content", {})
+    return {
+        "title": lesson["title"].strip(),
+        "slug": lesson["slug"].strip(),
+        "topic": lesson["topic"].strip(),
+        "type": _coerce_lesson_type(lesson["type"]),
+        "content": content,
+        "answer_key": _generate_answer_key(content),
+        "xp_reward": 10,
+    }
+
+
+def _upsert_lessons(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Write changed lessons with one INSERT ... ON CONFLICT (slug) DO UPDATE."""
+    slugs = [row["slug"] for row in rows]
+    existing = set(db.scalars(select(Lesson.slug).where(Lesson.slug.in_(slugs))))
+    for row in rows:
+        if row["slug"] in existing:
+            continue
+        # A lesson stored under another slug but the same title takes the new slug
+        renamed = db.execute(
+            select(Lesson.id, Lesson.slug).where(Lesson.title == row["title"], Lesson.slug.not_in(slugs)).order_by(Lesson.id).limit(1)
+        ).first()
+        if renamed is not None:
+            db.execute(update(Lesson).where(Lesson.id == renamed.id).values(slug=row["slug"]))
+            # The old slug keeps resolving, across restarts and workers
+            alias = dialect_insert(db, LessonSlugAlias).values(slug=renamed.slug, lesson_id=renamed.id)
+            db.execute(alias.on_conflict_do_update(index_elements=["slug"], set_={"lesson_id": alias.excluded.lesson_id}))
+    stmt = dialect_insert(db, Lesson).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["slug"],
+        set_={
+            "title": stmt.excluded.title,
+            "topic": stmt.excluded.topic,
+            "type": stmt.excluded.type,
+            "content": stmt.excluded.content,
+            "answer_key": stmt.excluded.answer_key,
+            # An XP reward set on the stored lesson wins
+            "xp_reward": case(
+                (or_(Lesson.xp_reward.is_(None), Lesson.xp_reward <= 0), stmt.excluded.xp_reward),
+                else_=Lesson.xp_reward,
+            ),
+        },
+    ))
+
+
+def _write_manifest(db: Session, digests: Dict[str, str]) -> None:
+    stmt = dialect_insert(db, SeedManifest).values([{"key": key, "digest": digest} for key, digest in digests.items()])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["key"], set_={"digest": stmt.excluded.digest, "updated_at": func.now()}
+    ))
+
+
 def seed():
+    """Create the schema and bring seed data up to date, incrementally.
+
+    The seed manifest holds a content hash per seeded item; only items whose
+    hash changed are written, so a restart with unchanged seed data costs
+    one manifest read. Rows edited directly in the database are not
+    overwritten until their seed data changes (or SEED_VERSION is bumped).
+    """
     Base.metadata.create_all(bind=engine)
+    _create_missing_indexes()
+    install_encyclopedia_search(engine)
     db = Session(bind=engine)
+    manifest = dict(db.execute(select(SeedManifest.key, SeedManifest.digest)).all())
+    if manifest.get(VERSION_KEY) != SEED_VERSION:
+        manifest = {}
+    written: Dict[str, str] = {}
 
-    # Seed user
-    if not db.query(User).first():
+    # Seed user, once: bcrypt only runs on the first boot
+    if TEST_USER_KEY not in manifest and not db.query(User).first():
         user = User(
             name="Test User",
             email="test@example.com",
@@ -72,6 +228,8 @@ def seed():
             privacy_settings={},
         )
         db.add(user)
+    if TEST_USER_KEY not in manifest:
+        written[TEST_USER_KEY] = "seeded"
 
     # Seed lessons from frontend quiz-data
     lessons = [
@@ -1159,62 +1317,38 @@ def seed():
         }
     ]
 
+    changed = []
     for lesson in lessons:
-        # Ensure required fields
-        title = lesson["title"].strip()
-        slug = lesson["slug"].strip()
-        topic = lesson["topic"].strip()
-        lesson_type = _coerce_lesson_type(lesson["type"])
-        content = lesson.get("content", {})
-
-        # Generate answer key
-        answer_key = _generate_answer_key(content)
+        row = _lesson_row(lesson)
+        key, digest = f"lesson:{row['slug']}", _digest(row)
+        if manifest.get(key) != digest:
+            changed.append(row)
+            written[key] = digest
+    if changed:
+        _upsert_lessons(db, changed)
 
-        # Try find existing by slug, else by title
-        existing = db.query(Lesson).filter(Lesson.slug == slug).first()
-        if not existing:
-            existing = db.query(Lesson).filter(Lesson.title == title).first()
-
-        if existing:
-            # Update in place to guarantee data presence
-            existing.title = title
-            existing.slug = slug
-            existing.topic = topic
-            existing.type = lesson_type
-            existing.content = content
-            existing.answer_key = answer_key
-            if existing.xp_reward is None or existing.xp_reward <= 0:
-                existing.xp_reward = 10
-        else:
-            db.add(
-                Lesson(
-                    title=title,
-                    topic=topic,
-                    type=lesson_type,
-                    slug=slug,
-                    content=content,
-                    answer_key=answer_key,
-                    xp_reward=10,
-                )
-            )
-
-    # Seed trivia challenge (unchanged)
-    if not db.query(TriviaChallenge).first():
-        trivia = TriviaChallenge(
-            week_id="2024-W01",
-            theme="Cultural Basics",
-            questions=[
-                {
-                    "q": "What is Singapore's main language?",
-                    "options": ["English", "Mandarin", "Malay", "Tamil"],
-                }
-            ],
-            correct_answers=["English"],
-        )
-        db.add(trivia)
+    # Seed the trivia question bank; weekly challenges are assembled from it
+    # by the trivia scheduler. Challenges copy their questions, so when the
+    # bank changes it is replaced wholesale, in the same transaction as its
+    # manifest digest.
+    trivia_digest = _digest(TRIVIA_QUESTIONS)
+    if manifest.get(TRIVIA_KEY) != trivia_digest:
+        db.execute(delete(TriviaQuestion))
+        db.execute(insert(TriviaQuestion), [
+            {"theme": theme, "question": question, "options": options, "answer": answer}
+            for theme, questions in TRIVIA_QUESTIONS.items()
+            for question, options, answer in questions
+        ])
+        written[TRIVIA_KEY] = trivia_digest
 
-    db.commit()
+    if written:
+        written[VERSION_KEY] = SEED_VERSION
+        _write_manifest(db, written)
+        db.commit()
     db.close()
+    if changed:
+        # Core statements skip the ORM session events that usually invalidate lesson caches
+        invalidate_lessons()
 
 
 if __name__ == "__main__":
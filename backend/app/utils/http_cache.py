@@ -0,0 +1,53 @@
+import gzip
+import hashlib
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+
+
+class EncodedBody(NamedTuple):
+    """A JSON body encoded once, in identity and gzip form, each with its own strong ETag."""
+    etag: str
+    body: bytes
+    gzip_etag: str
+    gzipped: bytes
+
+
+def encode_body(body: bytes) -> EncodedBody:
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    # mtime=0 keeps the gzip bytes, and so the ETag, stable across restarts
+    return EncodedBody(f'"{digest}"', body, f'"{digest}-gzip"', gzip.compress(body, compresslevel=9, mtime=0))
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def etag_matches(if_none_match: Optional[str], document: EncodedBody) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return document.etag in tags or document.gzip_etag in tags
+
+
+def conditional_response(request: Request, document: EncodedBody, cache_control: str) -> Response:
+    """304 if the client already has this version, else the precompressed or plain body."""
+    use_gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    headers: Dict[str, str] = {
+        "ETag": document.gzip_etag if use_gzip else document.etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), document):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=document.gzipped, media_type="application/json", headers=headers)
+    return Response(content=document.body, media_type="application/json", headers=headers)
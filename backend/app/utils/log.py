@@ -0,0 +1,45 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`time level logger message key=value ...`, with fields passed as `extra=`."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(f"{key}={value!r}" for key, value in vars(record).items() if key not in _RESERVED)
+        return f"{line} {fields}" if fields else line
+
+
+def configure_logging(level: str = "INFO") -> None:
+    """Route the `app` loggers through a queue to a background writer thread.
+
+    A logging call on the event loop only merges the message arguments and
+    enqueues the record; the QueueListener thread formats it and does the
+    blocking stdout write.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(KeyValueFormatter())
+    _listener = QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    logger = logging.getLogger("app")
+    logger.setLevel(level.upper())
+    logger.addHandler(QueueHandler(records))
+    logger.propagate = False
+    atexit.register(_listener.stop)
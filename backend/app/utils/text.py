@@ -0,0 +1,14 @@
+import re
+import unicodedata
+from typing import List
+
+_WORD = re.compile(r"\w+")
+_APOSTROPHES = re.compile(r"['’ʼ]")
+
+
+def fold_words(text: str) -> List[str]:
+    """Lowercase words with accents and apostrophes removed, so "bahai" matches "Bahá'í"."""
+    folded = _APOSTROPHES.sub("", text.casefold())
+    if not folded.isascii():
+        folded = "".join(ch for ch in unicodedata.normalize("NFKD", folded) if not unicodedata.combining(ch))
+    return _WORD.findall(folded)
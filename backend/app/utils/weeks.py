@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+
+def iso_week_id(moment: Optional[datetime] = None) -> str:
+    """ISO week identifier used for weekly boards and trivia, e.g. "2024-W01"."""
+    year, week, _ = (moment or datetime.utcnow()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_bounds(week_id: str) -> Tuple[datetime, datetime]:
+    """Naive UTC [start, end) of an ISO week: Monday 00:00 to the next Monday."""
+    start = datetime.strptime(f"{week_id}-1", "%G-W%V-%u")
+    return start, start + timedelta(days=7)
+
+
+def next_week_id(week_id: str, weeks: int = 1) -> str:
+    start, _ = week_bounds(week_id)
+    return iso_week_id(start + timedelta(weeks=weeks))
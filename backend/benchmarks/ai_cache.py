@@ -0,0 +1,74 @@
+"""Check and time near-duplicate matching in the AI answer cache.
+
+Caches one answer per SEEDED question, then looks up paraphrases that must
+hit and look-alike questions that must miss (a different faith or place of
+worship, or an added negation). Fails loudly on any wrong hit, then times
+lookups against a cache filled to AI_CACHE_SIZE.
+
+Run from the backend directory: python -m benchmarks.ai_cache
+"""
+import time
+
+from app.config import settings
+from app.controllers.ai_cache import AnswerCache
+
+SEEDED = [
+    "What should I wear to a Hindu temple?",
+    "Can I eat beef around Hindu colleagues?",
+    "How do I greet an elder at a Buddhist monastery?",
+    "Should I bring a gift to a Diwali celebration?",
+]
+
+# Paraphrases of a seeded question: same answer is right
+SAME = [
+    ("What to wear when visiting a Hindu temple?", SEEDED[0]),
+    ("what should i wear to hindu temples", SEEDED[0]),
+    ("Is it OK to eat beef around Hindu colleagues?", SEEDED[1]),
+    ("Should I bring gifts to a Diwali celebration?", SEEDED[3]),
+]
+
+# Look-alikes that need a different answer: must never be served a cached one
+DIFFERENT = [
+    "Can I wear shoes inside a Sikh temple?",
+    "Can I eat beef around Muslim colleagues?",
+    "What should I not wear to a temple?",
+    "What should I not wear to a Hindu temple?",
+    "What shouldn't I wear to a Hindu temple?",
+    "Can I never eat beef around Hindu colleagues?",
+    "How do I greet an elder at a Buddhist temple?",
+    "What should I wear to a Sikh gurdwara?",
+]
+
+LOOKUPS = 20000
+
+
+def check(cache: AnswerCache) -> None:
+    for query, expected in SAME:
+        hit = cache.lookup(query)
+        assert hit is not None and hit.response == f"answer: {expected}", f"expected a hit for {query!r}"
+    for query in DIFFERENT:
+        hit = cache.lookup(query)
+        assert hit is None, f"{query!r} was served the answer to {hit.response[8:]!r} ({hit.similarity})"
+    print(f"OK: {len(SAME)} paraphrases hit, {len(DIFFERENT)} look-alikes missed at threshold {cache.threshold}")
+
+
+def main():
+    cache = AnswerCache(settings.AI_CACHE_SIZE, settings.AI_CACHE_SIMILARITY)
+    for query in SEEDED:
+        cache.add(query, f"answer: {query}")
+    check(cache)
+
+    # Fill with unrelated questions so lookups go through realistic buckets
+    for i in range(settings.AI_CACHE_SIZE - len(SEEDED)):
+        cache.add(f"question {i} about custom {i % 97} and festival {i % 31}", "filler")
+    queries = [query for query, _ in SAME] + DIFFERENT
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        cache.lookup(queries[i % len(queries)])
+    elapsed = time.perf_counter() - start
+    print(f"{len(cache)} entries: {elapsed / LOOKUPS * 1e6:.1f} us/lookup")
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark per-request auth overhead of get_current_user_id.
+
+Compares the previous dependency (jwt.decode plus a print() on every call,
+stdout sent to /dev/null) with the current one: a token-cache hit, a cache
+miss that decodes, and the no-header development fallback that logs a
+warning through the queued logger.
+
+Run from the backend directory: python -m benchmarks.auth
+"""
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-auth-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from jose import jwt
+
+from app.config import settings
+from app.controllers.auth import token_cache
+from app.routes.user import create_access_token, get_current_user_id
+from app.utils.log import configure_logging
+
+CALLS = 20000
+USERS = 1000
+
+
+async def previous_dependency(authorization: str) -> int:
+    # The dependency as it was: decode and print on every request
+    token = authorization.split(" ")[1]
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    user_id = int(payload.get("sub"))
+    print(f"Successfully authenticated user_id: {user_id}")
+    return user_id
+
+
+async def timed(dependency, headers, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        await dependency(headers[i % len(headers)])
+    return (time.perf_counter() - start) / calls
+
+
+async def main():
+    devnull = open(os.devnull, "w")
+    with contextlib.redirect_stdout(devnull):
+        # The log writer thread keeps the stdout it was configured with
+        configure_logging("INFO")
+    headers = [f"Bearer {create_access_token({'sub': str(user_id)})}" for user_id in range(1, USERS + 1)]
+    with contextlib.redirect_stdout(devnull):
+        previous = await timed(previous_dependency, headers, CALLS // 10)
+    token_cache.clear()
+    miss = await timed(get_current_user_id, headers, USERS)
+    hit = await timed(get_current_user_id, headers, CALLS)
+    fallback = await timed(get_current_user_id, [None], CALLS // 10)
+    print(f"{'path':<36}{'per call':>12}")
+    print(f"{'previous (decode + print)':<36}{previous * 1e6:>10.1f}µs")
+    print(f"{'cache miss (decode + cache)':<36}{miss * 1e6:>10.1f}µs")
+    print(f"{'cache hit':<36}{hit * 1e6:>10.1f}µs")
+    print(f"{'no header (queued warning)':<36}{fallback * 1e6:>10.1f}µs")
+    print(token_cache.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Concurrency stress test for lesson completion.
+
+Starts the API on a scratch SQLite database, fires hundreds of parallel (and
+deliberately duplicated) completion requests, then asserts that every user
+was awarded each lesson's XP exactly once.
+
+Run from the backend directory: python -m benchmarks.completion_stress
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-stress-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'stress.db')}"
+
+import requests
+import uvicorn
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.models import Lesson, User, UserLessonProgress, XPTransaction
+from app.routes.user import create_access_token
+
+USERS = 20
+DUPLICATES = 5
+XP_PER_LESSON = 10
+WORKERS = 64
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def create_users():
+    db = SessionLocal()
+    users = [User(name=f"stress{i}", email=f"stress{i}@example.com", password_hash="!", xp=0) for i in range(USERS)]
+    db.add_all(users)
+    db.commit()
+    ids = [user.id for user in users]
+    slugs = [slug for (slug,) in db.query(Lesson.slug).all()]
+    db.close()
+    return ids, slugs
+
+
+def main():
+    server = start_server(port := free_port())
+    base = f"http://127.0.0.1:{port}"
+    user_ids, slugs = create_users()
+    tokens = {user_id: create_access_token({"sub": str(user_id)}) for user_id in user_ids}
+
+    jobs = []
+    for user_id in user_ids:
+        for slug in slugs:
+            for attempt in range(DUPLICATES):
+                # Mix both completion endpoints so they race against each other too
+                if attempt % 2:
+                    jobs.append((user_id, f"/users/me/lessons/{slug}/complete", {"xpEarned": XP_PER_LESSON}))
+                else:
+                    jobs.append((user_id, "/users/me/lessons/complete", {"lesson_slug": slug, "xp_earned": XP_PER_LESSON}))
+
+    local = threading.local()
+
+    def fire(job):
+        user_id, path, body = job
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        response = local.session.post(base + path, json=body, headers={"Authorization": f"Bearer {tokens[user_id]}"})
+        response.raise_for_status()
+        return response.json()["message"]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        messages = list(pool.map(fire, jobs))
+    elapsed = time.perf_counter() - started
+    server.should_exit = True
+
+    awarded = messages.count("Lesson completed successfully")
+    print(f"{len(jobs)} requests in {elapsed:.2f}s ({len(jobs) / elapsed:.0f} req/s), {awarded} awards")
+
+    expected_xp = len(slugs) * XP_PER_LESSON
+    db = SessionLocal()
+    failures = []
+    for user_id in user_ids:
+        xp = db.get(User, user_id).xp
+        transactions = db.query(XPTransaction).filter(XPTransaction.user_id == user_id).count()
+        completions = db.query(UserLessonProgress).filter(UserLessonProgress.user_id == user_id).count()
+        if xp != expected_xp or transactions != len(slugs) or completions != len(slugs):
+            failures.append((user_id, xp, transactions, completions))
+    db.close()
+
+    assert awarded == len(user_ids) * len(slugs), f"expected {len(user_ids) * len(slugs)} awards, got {awarded}"
+    assert not failures, f"(user_id, xp, transactions, completions) mismatches: {failures}"
+    print(f"OK: every user has exactly {expected_xp} XP from {len(slugs)} lessons")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
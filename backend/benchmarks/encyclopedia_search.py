@@ -0,0 +1,109 @@
+"""Benchmark encyclopedia search: FTS5 index vs LIKE scans.
+
+Fills a scratch SQLite database with ENTRIES synthetic encyclopedia entries
+(six sections each, so ENTRIES * 6 indexed sections) through the ORM table,
+letting the triggers build the FTS5 index, then times single-word,
+multi-word and prefix queries against LIKE scans over every section. LIKE
+matches words anywhere in an entry, FTS5 within one section, so match
+counts differ on multi-word queries.
+
+Run from the backend directory: python -m benchmarks.encyclopedia_search
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-encyclopedia-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import insert, text
+
+from app.controllers.encyclopedia_search import SECTIONS, install_encyclopedia_search, match_expression, search_encyclopedia
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.models.models import Base, EncyclopediaCategory, EncyclopediaEntry
+
+ENTRIES = 6000
+WORDS_PER_SECTION = 120
+REPEAT = 50
+QUERIES = ["pilgrimage", "lantern festival", "respect elders", "ramad*", "temple offerings incense", "gurdwara vesak"]
+
+TOPIC_WORDS = (
+    "faith prayer festival lantern temple mosque church gurdwara pilgrimage fasting ramadan deepavali vesak "
+    "harmony community family elders respect offerings incense scripture tradition ancestors harvest"
+).split()
+
+
+def make_vocabulary(rng: random.Random, size: int = 20000):
+    syllables = ["ka", "lo", "mi", "ra", "se", "tu", "an", "be", "chi", "do", "en", "fa", "go", "hu", "ir", "jo"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(syllables, k=rng.randint(2, 4))))
+    return list(words)
+
+
+def make_rows():
+    rng = random.Random(42)
+    # Zipf: a few filler words are very common, most are rare; topic words
+    # are mixed in at mid-to-low frequency like real subject terms
+    vocabulary = make_vocabulary(rng)
+    for i, word in enumerate(TOPIC_WORDS):
+        vocabulary.insert(200 + i * 300, word)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rows = []
+    for i in range(ENTRIES):
+        row = {
+            "category": rng.choice(list(EncyclopediaCategory)),
+            "group_name": f"Group {i}",
+        }
+        for section in SECTIONS:
+            row[section] = " ".join(rng.choices(vocabulary, weights, k=WORDS_PER_SECTION)).capitalize() + "."
+        rows.append(row)
+    return rows
+
+
+def like_sql(query: str, limit: bool):
+    words = [word.rstrip("*") for word in query.split()]
+    clauses = " AND ".join(
+        "(" + " OR ".join(f"{section} LIKE :w{i}" for section in SECTIONS) + ")" for i in range(len(words))
+    )
+    suffix = " LIMIT 20" if limit else ""
+    return text(f"SELECT id FROM encyclopedia_entries WHERE {clauses}{suffix}"), {f"w{i}": f"%{word}%" for i, word in enumerate(words)}
+
+
+async def timed(db, statement, params, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = (await db.execute(statement, params)).all()
+    return (time.perf_counter() - started) / repeat, len(result)
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+    install_encyclopedia_search(engine)
+    rows = make_rows()
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(EncyclopediaEntry), rows)
+    print(f"{ENTRIES} entries, {ENTRIES * len(SECTIONS)} sections indexed in {time.perf_counter() - started:.2f}s")
+
+    async with AsyncSessionLocal() as db:
+        for query in QUERIES:
+            match = match_expression(query)
+            started = time.perf_counter()
+            for _ in range(REPEAT):
+                results = await search_encyclopedia(db, match, None, 20, 0)
+            fts = (time.perf_counter() - started) / REPEAT
+
+            like_first, _ = await timed(db, *like_sql(query, limit=True), max(REPEAT // 10, 1))
+            like_all, matches = await timed(db, *like_sql(query, limit=False), max(REPEAT // 10, 1))
+            print(
+                f"{query!r:>28}: fts5 {fts * 1000:7.2f} ms (top {len(results)} ranked + snippets) | "
+                f"like first 20 {like_first * 1000:7.2f} ms, all {matches} {like_all * 1000:7.2f} ms (unranked)"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Benchmark the friendship graph index on a 100k-user graph.
+
+Builds a random graph (each user befriends FRIENDS_PER_USER others, so the
+average degree is about twice that) and times load, mutual-friend queries,
+cold and cached suggestions, and edge churn. For comparison the same mutual
+and suggestion queries run as SQL self-joins against an indexed SQLite table.
+
+Run from the backend directory: python -m benchmarks.friend_graph
+"""
+import random
+import sqlite3
+import time
+
+from app.controllers.friends import FriendGraph
+
+USERS = 100_000
+FRIENDS_PER_USER = 10
+SAMPLES = 2000
+SQL_SAMPLES = 200
+
+
+def make_edges():
+    rng = random.Random(42)
+    edges = set()
+    for user_id in range(1, USERS + 1):
+        for _ in range(FRIENDS_PER_USER):
+            friend_id = rng.randint(1, USERS)
+            if friend_id != user_id and (friend_id, user_id) not in edges:
+                edges.add((user_id, friend_id))
+    return list(edges)
+
+
+def timed(label, fn, count):
+    started = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>28}: {elapsed / count * 1e6:9.1f} us/op")
+
+
+def sql_baseline(edges, pairs, users):
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE friendships (user_id INTEGER, friend_id INTEGER)")
+    # Both directions, as a query over accepted rows would have to union them
+    db.executemany("INSERT INTO friendships VALUES (?, ?)", edges + [(b, a) for a, b in edges])
+    db.execute("CREATE INDEX ix_user ON friendships (user_id, friend_id)")
+    timed("sql mutual", lambda i: db.execute(
+        "SELECT a.friend_id FROM friendships a JOIN friendships b ON a.friend_id = b.friend_id "
+        "WHERE a.user_id = ? AND b.user_id = ?", pairs[i]).fetchall(), SQL_SAMPLES)
+    timed("sql suggestions", lambda i: db.execute(
+        "SELECT fof.friend_id, COUNT(*) AS mutual FROM friendships f "
+        "JOIN friendships fof ON fof.user_id = f.friend_id "
+        "WHERE f.user_id = ?1 AND fof.friend_id != ?1 "
+        "AND fof.friend_id NOT IN (SELECT friend_id FROM friendships WHERE user_id = ?1) "
+        "GROUP BY fof.friend_id ORDER BY mutual DESC, fof.friend_id LIMIT 10", (users[i],)).fetchall(), SQL_SAMPLES)
+
+
+def main():
+    edges = make_edges()
+    print(f"{USERS} users, {len(edges)} accepted friendships (avg degree {2 * len(edges) / USERS:.1f})")
+    graph = FriendGraph()
+    started = time.perf_counter()
+    graph.load(edges)
+    print(f"{'load':>28}: {time.perf_counter() - started:9.2f} s")
+
+    rng = random.Random(7)
+    users = [rng.randint(1, USERS) for _ in range(SAMPLES)]
+    # Friends of friends, so most pairs actually share someone
+    pairs = []
+    for user_id in users:
+        friends = graph.friends(user_id) or [user_id]
+        friends_of_friend = graph.friends(rng.choice(friends)) or [user_id]
+        pairs.append((user_id, rng.choice(friends_of_friend)))
+
+    timed("mutual", lambda i: graph.mutual(*pairs[i]), SAMPLES)
+    timed("suggestions (cold)", lambda i: graph.suggestions(users[i], 10), SAMPLES)
+    timed("suggestions (cached)", lambda i: graph.suggestions(users[i], 10), SAMPLES)
+    churn = [(rng.randint(1, USERS), rng.randint(1, USERS)) for _ in range(SAMPLES)]
+    timed("add + remove edge", lambda i: (graph.add(*churn[i]), graph.remove(*churn[i])), SAMPLES)
+    timed("suggestions (after churn)", lambda i: graph.suggestions(users[i], 10), SAMPLES)
+
+    sql_baseline(edges, pairs, users)
+
+
+if __name__ == "__main__":
+    main()
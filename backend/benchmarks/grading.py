@@ -0,0 +1,45 @@
+"""Micro-benchmark for lesson grading cost per submission.
+
+Run from the backend directory: python -m benchmarks.grading
+"""
+import random
+import timeit
+
+from app.controllers.grading import compile_answer_key
+
+
+def make_answer_key(parts: int, questions: int):
+    rng = random.Random(42)
+    return {f"part{p + 1}": {f"q{q}": rng.randrange(4) for q in range(questions)} for p in range(parts)}
+
+
+def make_submission(answer_key, accuracy: float):
+    rng = random.Random(7)
+    return {
+        part: {q: (answer if rng.random() < accuracy else (answer + 1) % 4) for q, answer in questions.items()}
+        for part, questions in answer_key.items()
+    }
+
+
+def main(number: int = 20000):
+    for parts, questions in [(1, 10), (3, 10), (10, 20)]:
+        answer_key = make_answer_key(parts, questions)
+        submission = make_submission(answer_key, accuracy=0.7)
+        grader = compile_answer_key(1, answer_key, 10)
+
+        compile_cost = timeit.timeit(lambda: compile_answer_key(1, answer_key, 10), number=number // 10) / (number // 10)
+        grade_cost = timeit.timeit(lambda: grader.grade(submission), number=number) / number
+        # Baseline: the previous whole-dict comparison (all-or-nothing, no per-part scores)
+        equality_cost = timeit.timeit(lambda: answer_key == submission, number=number) / number
+
+        result = grader.grade(submission)
+        print(
+            f"{parts:>2} parts x {questions:>2} questions: "
+            f"grade {grade_cost * 1e6:7.2f} us/submission "
+            f"(dict equality {equality_cost * 1e6:6.2f} us, compile {compile_cost * 1e6:7.2f} us once) "
+            f"score {result.score}/{result.max_score} xp {result.xp_awarded}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark XP award throughput with and without the group-commit writer.
+
+Each mode fires the same number of concurrent awards at a scratch SQLite
+database: "direct" commits every award in its own transaction (the path
+award_xp takes with the writer off), "grouped" queues them to the XPWriter.
+Reports awards/s, commits/s and any awards that failed.
+
+Run from the backend directory: python -m benchmarks.group_commit
+"""
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-group-commit-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.controllers.xp_writer import XPAward, XPWriter, apply_award
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.models.models import Base, User, XPTransaction
+
+USERS = 200
+AWARDS = 5000
+CONCURRENCY = 200
+
+
+async def reset():
+    Base.metadata.create_all(bind=engine)
+    async with AsyncSessionLocal() as db:
+        await db.execute(XPTransaction.__table__.delete())
+        await db.execute(User.__table__.delete())
+        db.add_all([User(id=i, name=f"bench{i}", email=f"bench{i}@example.com", password_hash="!", xp=0) for i in range(1, USERS + 1)])
+        await db.commit()
+
+
+async def fire(submit):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    failures = Counter()
+
+    async def one(i):
+        async with semaphore:
+            try:
+                await submit(XPAward(user_id=i % USERS + 1, xp=1, source="bench"))
+            except Exception as exc:
+                # Recorded, not fatal: the report shows what each mode lost
+                failures[type(exc).__name__] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(AWARDS)))
+    return time.perf_counter() - started, failures
+
+
+async def verify(failures):
+    expected = AWARDS - sum(failures.values())
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(select(func.sum(User.xp)))
+        rows = await db.scalar(select(func.count()).select_from(XPTransaction))
+    assert total == expected and rows == expected, (total, rows, expected)
+
+
+async def direct():
+    async def submit(award):
+        async with AsyncSessionLocal() as db:
+            await apply_award(db, award)
+
+    elapsed, failures = await fire(submit)
+    return elapsed, AWARDS - sum(failures.values()), failures
+
+
+async def grouped():
+    writer = XPWriter(AsyncSessionLocal, settings.XP_WRITER_WINDOW_MS / 1000, settings.XP_WRITER_MAX_BATCH)
+    writer.start()
+    elapsed, failures = await fire(writer.submit)
+    await writer.stop()
+    return elapsed, writer.batches, failures
+
+
+async def main():
+    print(f"{AWARDS} awards, {CONCURRENCY} concurrent, window {settings.XP_WRITER_WINDOW_MS} ms, max batch {settings.XP_WRITER_MAX_BATCH}")
+    for name, mode in [("direct", direct), ("grouped", grouped)]:
+        await reset()
+        elapsed, commits, failures = await mode()
+        await verify(failures)
+        print(
+            f"{name:>8}: {AWARDS / elapsed:8.0f} awards/s, {commits / elapsed:8.0f} commits/s, {commits} commits in {elapsed:.2f}s, "
+            f"failed {dict(failures) or 0}"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
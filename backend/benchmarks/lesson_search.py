@@ -0,0 +1,76 @@
+"""Benchmark lesson question search: in-memory inverted index vs a linear scan.
+
+Seeds a scratch SQLite database, copies every seeded lesson COPIES times
+under new slugs (so the index holds thousands of questions), then times
+building the index and running queries through it against a scan that
+tokenizes every question on each request.
+
+Run from the backend directory: python -m benchmarks.lesson_search
+"""
+import os
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-lesson-search-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.controllers.lesson_parts import lesson_parts
+from app.controllers.lesson_search import LessonSearchIndex, tokenize
+from app.database import engine
+from app.models.models import Lesson
+from app.seed import seed
+
+COPIES = 40
+REPEAT = 2000
+QUERIES = ["ramadan", "festival of lights", "bahai", "buddh*", "respect elders greeting", "pray* five times"]
+
+
+def load_rows():
+    seed()
+    with Session(engine) as db:
+        lessons = db.execute(select(Lesson.slug, Lesson.title, Lesson.content)).all()
+    return [(f"{slug}-{copy}", title, content) for copy in range(COPIES) for slug, title, content in lessons]
+
+
+def scan(rows, query, limit):
+    # What a request costs without the index: tokenize every question, count overlaps
+    terms = set(tokenize(query.replace("*", "")))
+    hits = []
+    for slug, _, content in rows:
+        for part_number, part in enumerate(lesson_parts(content or {}), start=1):
+            for index, question in enumerate(part.get("questions", [])):
+                text = " ".join([
+                    question.get("questionText", ""),
+                    " ".join(answer.get("text", "") for answer in question.get("answers", [])),
+                    question.get("explanation", ""),
+                ])
+                overlap = len(terms.intersection(tokenize(text)))
+                if overlap:
+                    hits.append((-overlap, slug, part_number, index))
+    return sorted(hits)[:limit]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    rows = load_rows()
+    build, index = timed(lambda: LessonSearchIndex.build(rows), 3)
+    print(f"{len(index.questions)} questions, {len(index.vocabulary)} terms, build {build * 1000:.1f}ms")
+    print(f"{'query':<28}{'hits':>6}{'index':>12}{'scan':>12}")
+    for query in QUERIES:
+        indexed, results = timed(lambda: index.search(query, 20), REPEAT)
+        scanned, _ = timed(lambda: scan(rows, query, 20), 3)
+        hits = len(index.search(query, len(index.questions)))
+        print(f"{query:<28}{hits:>6}{indexed * 1e6:>10.1f}µs{scanned * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark /lessons latency while /users/login is under load.
+
+Starts the API on a scratch SQLite database and measures GET /lessons/
+latency three ways: idle, during a login storm with bcrypt on the shared
+threadpool (the password pool stopped, as before it existed), and during
+the same storm with the dedicated password process pool. Logins rejected
+with 503 by the pool's queue-depth limit are counted separately.
+
+Run from the backend directory: python -m benchmarks.login_load
+"""
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-login-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+import requests
+import uvicorn
+
+from app.main import app
+from app.controllers.passwords import password_hasher
+
+LOGIN_THREADS = 16
+DURATION = 8.0
+EMAIL = "login-bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def storm(base: str, stop: threading.Event, statuses: Counter) -> None:
+    with requests.Session() as session:
+        while not stop.is_set():
+            response = session.post(f"{base}/users/login", json={"name": "bench", "email": EMAIL, "password": PASSWORD})
+            statuses[response.status_code] += 1
+
+
+def measure(base: str, logins: bool) -> None:
+    stop = threading.Event()
+    statuses: Counter = Counter()
+    threads = [threading.Thread(target=storm, args=(base, stop, statuses)) for _ in range(LOGIN_THREADS if logins else 0)]
+    for thread in threads:
+        thread.start()
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+    with requests.Session() as session:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            session.get(f"{base}/lessons/").raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"  /lessons p50 {statistics.median(latencies) * 1000:7.1f}ms  p99 {p99 * 1000:7.1f}ms  "
+        f"({len(latencies)} requests); logins {dict(statuses)}"
+    )
+
+
+def main():
+    server = start_server(port := free_port())
+    base = f"http://127.0.0.1:{port}"
+    requests.post(f"{base}/users/register", json={"name": "bench", "email": EMAIL, "password": PASSWORD}).raise_for_status()
+
+    print("idle")
+    measure(base, logins=False)
+    password_hasher.stop()
+    print(f"login storm, bcrypt on the threadpool ({LOGIN_THREADS} clients)")
+    measure(base, logins=True)
+    password_hasher.start()
+    print(f"login storm, password process pool ({password_hasher.workers} workers, max {password_hasher.max_pending} pending)")
+    measure(base, logins=True)
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark the Monday trivia rush.
+
+Every user submits this week's challenge at the same moment (plus a share of
+duplicate resubmissions). Each submission does what POST /trivia/{week}/submit
+does: look up the compiled challenge, grade it and queue the entry through the
+group-commit writer. Reports submissions/s, database reads of the challenge
+row and checks one entry per user.
+
+Run from the backend directory: python -m benchmarks.trivia_burst
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="hq-trivia-burst-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import event, func, select
+
+from app.config import settings
+from app.controllers.leaderboard import trivia_boards
+from app.controllers.trivia import TriviaSubmission, trivia_registry
+from app.controllers.xp_writer import XPAward, XPWriter
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.models.models import Base, TriviaChallenge, TriviaEntry, User
+from app.utils.weeks import iso_week_id
+
+USERS = 5000
+DUPLICATE_SHARE = 0.2
+QUESTIONS = 20
+CONCURRENCY = 500
+
+
+def make_challenge(week_id: str) -> TriviaChallenge:
+    options = ["A", "B", "C", "D"]
+    return TriviaChallenge(
+        week_id=week_id,
+        theme="Benchmark",
+        questions=[{"q": f"Question {i}", "options": options} for i in range(QUESTIONS)],
+        correct_answers=[options[i % 4] for i in range(QUESTIONS)],
+    )
+
+
+async def reset(week_id: str):
+    Base.metadata.create_all(bind=engine)
+    async with AsyncSessionLocal() as db:
+        db.add_all([User(id=i, name=f"bench{i}", email=f"bench{i}@example.com", password_hash="!", xp=0) for i in range(1, USERS + 1)])
+        db.add(make_challenge(week_id))
+        await db.commit()
+
+
+async def main():
+    week_id = iso_week_id()
+    await reset(week_id)
+    rng = random.Random(42)
+    submitters = list(range(1, USERS + 1)) + rng.sample(range(1, USERS + 1), int(USERS * DUPLICATE_SHARE))
+    rng.shuffle(submitters)
+
+    challenge_reads = 0
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_reads(conn, cursor, statement, parameters, context, executemany):
+        nonlocal challenge_reads
+        if statement.lstrip().upper().startswith("SELECT") and "trivia_challenges" in statement:
+            challenge_reads += 1
+
+    writer = XPWriter(AsyncSessionLocal, settings.XP_WRITER_WINDOW_MS / 1000, settings.XP_WRITER_MAX_BATCH)
+    writer.start()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def submit(user_id):
+        async with semaphore, AsyncSessionLocal() as db:
+            challenge = await trivia_registry.load(db, week_id)
+            answers = [rng.choice("ABCD") for _ in range(QUESTIONS)]
+            score = challenge.grade(answers)
+            credited = await writer.submit(XPAward(
+                user_id=user_id,
+                xp=score * settings.TRIVIA_XP_PER_CORRECT,
+                source="trivia",
+                trivia=TriviaSubmission(week_id, answers, score),
+            ))
+            # None: a duplicate entry for the week, dropped
+            return credited is not None
+
+    started = time.perf_counter()
+    accepted = await asyncio.gather(*(submit(user_id) for user_id in submitters))
+    elapsed = time.perf_counter() - started
+    await writer.stop()
+
+    async with AsyncSessionLocal() as db:
+        entries = await db.scalar(select(func.count()).select_from(TriviaEntry).where(TriviaEntry.week_id == week_id))
+    await async_engine.dispose()
+
+    print(f"{len(submitters)} submissions ({USERS} users, {len(submitters) - USERS} duplicates), {CONCURRENCY} concurrent")
+    print(f"{len(submitters) / elapsed:8.0f} submissions/s in {elapsed:.2f}s, {writer.batches} commits, avg batch {writer.stats()['avg_batch']}")
+    print(f"challenge row read {challenge_reads} time(s), {sum(accepted)} accepted, {entries} entries, {len(trivia_boards.week(week_id))} on the board")
+    assert sum(accepted) == entries == USERS, (sum(accepted), entries)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())